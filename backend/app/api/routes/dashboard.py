@@ -2,17 +2,20 @@
 Dashboard API endpoints
 """
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.core.security import get_current_user
 from app.services.dashboard.dashboard_service import DashboardService
 from app.services.dashboard.models.time_range import TimeRange
+from app.services.dashboard.models.dashboard_models import DashboardSnapshot
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
 
-@router.get("/snapshot")
+@router.get("/snapshot", response_model=DashboardSnapshot)
 async def get_dashboard_snapshot(
     time_range: str = Query("1M", regex="^(1M|3M|1Y|ALL)$", description="Time range: 1M, 3M, 1Y, or ALL"),
     db: Session = Depends(get_db),
@@ -36,10 +39,14 @@ async def get_dashboard_snapshot(
         # Get user_id from authenticated user
         user_id = int(user.get("user_id"))
         
-        # Build dashboard
-        snapshot = DashboardService.build_dashboard(db, user_id, tr)
+        # Build dashboard off the event loop so concurrent requests overlap
+        snapshot = await run_in_threadpool(
+            DashboardService.get_dashboard, db, user_id, tr
+        )
         
-        return snapshot
+        # model_dump runs in pydantic-core and orjson formats datetimes natively,
+        # skipping jsonable_encoder's per-point Python walk over the series
+        return ORJSONResponse(snapshot.model_dump())
     
     except ValueError as e:
         raise HTTPException(
@@ -0,0 +1,73 @@
+"""
+In-process TTL cache with single-flight loading
+"""
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe TTL cache.
+    
+    Concurrent misses for the same key share a single call to the loader,
+    so N identical requests arriving together cost one upstream fetch.
+    """
+    
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+    
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader() on a miss"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not is_owner:
+            return future.result()
+        
+        try:
+            value = loader()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+        
+        with self._lock:
+            self._store(key, value)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+    
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single key"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop all cached values"""
+        with self._lock:
+            self._data.clear()
+    
+    def _store(self, key: Hashable, value: Any) -> None:
+        """Insert under lock, evicting expired then oldest entries when full"""
+        now = time.monotonic()
+        if len(self._data) >= self.maxsize:
+            for stale_key in [k for k, (expires, _) in self._data.items() if expires <= now]:
+                del self._data[stale_key]
+            while len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+        self._data.pop(key, None)
+        self._data[key] = (now + self.ttl, value)
@@ -1,8 +1,12 @@
 """
 Authentication and JWT security utilities
 """
+import hashlib
+import os
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Optional
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -12,6 +16,21 @@ from app.core.config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/users/login")
 
+_NONCE_SIZE = 12
+
+
+def require_token_encryption_key() -> str:
+    """Return TOKEN_ENCRYPTION_KEY, raising if it is not configured"""
+    if not settings.TOKEN_ENCRYPTION_KEY:
+        raise RuntimeError("TOKEN_ENCRYPTION_KEY must be set to encrypt third-party tokens")
+    return settings.TOKEN_ENCRYPTION_KEY
+
+
+@lru_cache(maxsize=1)
+def _token_cipher() -> AESGCM:
+    """AES-GCM cipher keyed from TOKEN_ENCRYPTION_KEY"""
+    return AESGCM(hashlib.sha256(require_token_encryption_key().encode()).digest())
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -23,6 +42,18 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def encrypt_token(token: str) -> bytes:
+    """Encrypt a third-party token with AES-GCM (nonce prepended to ciphertext)"""
+    nonce = os.urandom(_NONCE_SIZE)
+    return nonce + _token_cipher().encrypt(nonce, token.encode(), None)
+
+
+def decrypt_token(blob: bytes) -> str:
+    """Decrypt a token produced by encrypt_token"""
+    blob = bytes(blob)
+    return _token_cipher().decrypt(blob[:_NONCE_SIZE], blob[_NONCE_SIZE:], None).decode()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
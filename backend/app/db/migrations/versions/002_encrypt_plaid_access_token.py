@@ -0,0 +1,56 @@
+"""Store plaid_access_token as encrypted BYTEA
+
+Revision ID: 002_encrypt_plaid_access_token
+Revises: 001_initial_schema
+Create Date: 2025-01-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.security import encrypt_token, decrypt_token, require_token_encryption_key
+
+# revision identifiers, used by Alembic.
+revision = '002_encrypt_plaid_access_token'
+down_revision = '001_initial_schema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    require_token_encryption_key()
+    
+    op.add_column('users', sa.Column('plaid_access_token_enc', sa.LargeBinary(), nullable=True))
+    
+    # Re-encrypt existing plaintext tokens into the new binary column
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text("SELECT id, plaid_access_token FROM users WHERE plaid_access_token IS NOT NULL")
+    ).fetchall()
+    for user_id, token in rows:
+        conn.execute(
+            sa.text("UPDATE users SET plaid_access_token_enc = :blob WHERE id = :id"),
+            {"blob": encrypt_token(token), "id": user_id},
+        )
+    
+    op.drop_column('users', 'plaid_access_token')
+    op.alter_column('users', 'plaid_access_token_enc', new_column_name='plaid_access_token')
+
+
+def downgrade() -> None:
+    require_token_encryption_key()
+    
+    op.add_column('users', sa.Column('plaid_access_token_plain', sa.String(), nullable=True))
+    
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text("SELECT id, plaid_access_token FROM users WHERE plaid_access_token IS NOT NULL")
+    ).fetchall()
+    for user_id, blob in rows:
+        conn.execute(
+            sa.text("UPDATE users SET plaid_access_token_plain = :token WHERE id = :id"),
+            {"token": decrypt_token(blob), "id": user_id},
+        )
+    
+    op.drop_column('users', 'plaid_access_token')
+    op.alter_column('users', 'plaid_access_token_plain', new_column_name='plaid_access_token')
@@ -0,0 +1,58 @@
+"""Add unique index on position snapshots
+
+Revision ID: 003_positions_snapshot_unique
+Revises: 002_encrypt_plaid_access_token
+Create Date: 2025-01-27 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_positions_snapshot_unique'
+down_revision = '002_encrypt_plaid_access_token'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # dividends.position_id cascades on delete, so first re-point dividends of
+    # duplicate rows at the row that survives (the newest per snapshot key)
+    op.execute(sa.text(
+        """
+        UPDATE dividends dv
+        SET position_id = k.keep_id
+        FROM (
+            SELECT id, MAX(id) OVER (
+                PARTITION BY user_id, account_id, ticker, snapshot_timestamp
+            ) AS keep_id
+            FROM positions
+        ) k
+        WHERE dv.position_id = k.id
+          AND k.id <> k.keep_id
+        """
+    ))
+    # Keep the newest row for any duplicated snapshot key before enforcing uniqueness
+    op.execute(sa.text(
+        """
+        DELETE FROM positions p
+        USING positions d
+        WHERE p.user_id = d.user_id
+          AND p.account_id IS NOT DISTINCT FROM d.account_id
+          AND p.ticker = d.ticker
+          AND p.snapshot_timestamp = d.snapshot_timestamp
+          AND p.id < d.id
+        """
+    ))
+    # A unique index rather than a constraint so account_id can be coalesced:
+    # NULLs are distinct in UNIQUE, which would let account-less holdings duplicate
+    op.create_index(
+        'uq_positions_snapshot',
+        'positions',
+        ['user_id', sa.text('COALESCE(account_id, 0)'), 'ticker', 'snapshot_timestamp'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_positions_snapshot', table_name='positions')
@@ -0,0 +1,28 @@
+"""Add (user_id, snapshot_timestamp DESC) index on positions
+
+Revision ID: 004_positions_user_snapshot_index
+Revises: 003_positions_snapshot_unique
+Create Date: 2025-01-28 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_positions_user_snapshot_index'
+down_revision = '003_positions_snapshot_unique'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # MAX(snapshot_timestamp) for a user becomes a single index probe
+    op.create_index(
+        'idx_positions_user_snapshot',
+        'positions',
+        ['user_id', sa.text('snapshot_timestamp DESC')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_positions_user_snapshot', table_name='positions')
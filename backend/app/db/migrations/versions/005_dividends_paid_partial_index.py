@@ -0,0 +1,29 @@
+"""Add partial (user_id, pay_date) index on paid dividends
+
+Revision ID: 005_dividends_paid_partial_index
+Revises: 004_positions_user_snapshot_index
+Create Date: 2025-01-29 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_dividends_paid_partial_index'
+down_revision = '004_positions_user_snapshot_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Only paid rows are indexed, so upcoming dividends never bloat the scan
+    op.create_index(
+        'idx_dividends_paid_user_pay_date',
+        'dividends',
+        ['user_id', 'pay_date'],
+        postgresql_where=sa.text("status = 'paid'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_dividends_paid_user_pay_date', table_name='dividends')
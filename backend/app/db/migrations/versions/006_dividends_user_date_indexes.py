@@ -0,0 +1,48 @@
+"""Add composite (user_id, pay_date) and (user_id, status, ex_date) indexes on dividends
+
+The (user_id, pay_date) index serves paid-only and user-only lookups too, so the
+partial paid index and the single-column user_id index are dropped.
+
+Revision ID: 006_dividends_user_date_indexes
+Revises: 005_dividends_paid_partial_index
+Create Date: 2025-01-30 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_dividends_user_date_indexes'
+down_revision = '005_dividends_paid_partial_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Cash-flow queries range over pay_date for every status
+    op.create_index(
+        'idx_dividends_user_pay_date',
+        'dividends',
+        ['user_id', 'pay_date'],
+    )
+    # Upcoming dividends filter on status and range/order by ex_date
+    op.create_index(
+        'idx_dividends_user_status_ex_date',
+        'dividends',
+        ['user_id', 'status', 'ex_date'],
+    )
+    # Both are prefixes of / subsumed by (user_id, pay_date)
+    op.drop_index('idx_dividends_paid_user_pay_date', table_name='dividends')
+    op.drop_index('idx_dividends_user_id', table_name='dividends')
+
+
+def downgrade() -> None:
+    op.create_index('idx_dividends_user_id', 'dividends', ['user_id'], unique=False)
+    op.create_index(
+        'idx_dividends_paid_user_pay_date',
+        'dividends',
+        ['user_id', 'pay_date'],
+        postgresql_where=sa.text("status = 'paid'"),
+    )
+    op.drop_index('idx_dividends_user_status_ex_date', table_name='dividends')
+    op.drop_index('idx_dividends_user_pay_date', table_name='dividends')
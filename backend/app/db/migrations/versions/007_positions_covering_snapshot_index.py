@@ -0,0 +1,40 @@
+"""Make the positions (user_id, snapshot_timestamp DESC) index covering
+
+Its user_id prefix also serves plain user lookups, so idx_positions_user_id is dropped.
+
+Revision ID: 007_positions_covering_snapshot_index
+Revises: 006_dividends_user_date_indexes
+Create Date: 2025-01-31 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_positions_covering_snapshot_index'
+down_revision = '006_dividends_user_date_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Daily totals and allocation read only these columns, so with them
+    # included Postgres can answer from the index without heap fetches
+    op.drop_index('idx_positions_user_snapshot', table_name='positions')
+    op.create_index(
+        'idx_positions_user_snapshot',
+        'positions',
+        ['user_id', sa.text('snapshot_timestamp DESC')],
+        postgresql_include=['account_id', 'ticker', 'asset_type', 'market_value'],
+    )
+    op.drop_index('idx_positions_user_id', table_name='positions')
+
+
+def downgrade() -> None:
+    op.create_index('idx_positions_user_id', 'positions', ['user_id'], unique=False)
+    op.drop_index('idx_positions_user_snapshot', table_name='positions')
+    op.create_index(
+        'idx_positions_user_snapshot',
+        'positions',
+        ['user_id', sa.text('snapshot_timestamp DESC')],
+    )
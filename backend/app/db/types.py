@@ -0,0 +1,22 @@
+"""
+Custom SQLAlchemy column types
+"""
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+from app.core.security import encrypt_token, decrypt_token
+
+
+class EncryptedBinary(TypeDecorator):
+    """String value stored as raw AES-GCM ciphertext (BYTEA on PostgreSQL)"""
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encrypt_token(value)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decrypt_token(value)
@@ -3,13 +3,19 @@ FastAPI entrypoint for strc_tracker backend
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api.routes import positions, dividends, users, dashboard
 from app.core.config import settings
+from app.core.security import require_token_encryption_key
+
+# Fail fast rather than on the first Plaid token read/write
+require_token_encryption_key()
 
 app = FastAPI(
     title="STRC Tracker API",
     description="Backend API for tracking stock positions and dividends",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -38,10 +38,14 @@ class Dividend(Base):
     
     # Indexes
     __table_args__ = (
-        Index('idx_dividends_user_id', 'user_id'),
         Index('idx_dividends_ticker', 'ticker'),
         Index('idx_dividends_pay_date', 'pay_date'),
         Index('idx_dividends_status', 'status'),
+        # Cash flows and paid activity: user + pay_date range (also serves
+        # plain user_id lookups)
+        Index('idx_dividends_user_pay_date', 'user_id', 'pay_date'),
+        # Upcoming activity: user + status, ex_date range in ex_date order
+        Index('idx_dividends_user_status_ex_date', 'user_id', 'status', 'ex_date'),
     )
     
     def is_upcoming(self) -> bool:
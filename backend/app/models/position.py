@@ -1,9 +1,10 @@
 """
 Position model for tracking stock positions with historical snapshots
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Index
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Index, func, literal_column
 from sqlalchemy.orm import relationship
 from typing import Optional
+from decimal import Decimal
 from app.db.base import Base
 from datetime import datetime
 
@@ -34,38 +35,52 @@ class Position(Base):
         cascade="all, delete-orphan"
     )
     
-    # Indexes
+    # Indexes and constraints
     __table_args__ = (
-        Index('idx_positions_user_id', 'user_id'),
+        # One row per holding per snapshot; account_id is coalesced so holdings
+        # without an account dedupe too (NULLs are distinct in a plain UNIQUE)
+        Index(
+            'uq_positions_snapshot',
+            'user_id', func.coalesce(account_id, literal_column('0')), 'ticker', 'snapshot_timestamp',
+            unique=True,
+        ),
         Index('idx_positions_ticker', 'ticker'),
         Index('idx_positions_account_id', 'account_id'),
         Index('idx_positions_snapshot_timestamp', 'snapshot_timestamp'),
+        # Latest-snapshot lookups, per-user range scans and plain user_id
+        # lookups; on Postgres the included columns let the daily-total and
+        # allocation aggregates run as index-only scans
+        Index(
+            'idx_positions_user_snapshot', 'user_id', snapshot_timestamp.desc(),
+            postgresql_include=['account_id', 'ticker', 'asset_type', 'market_value'],
+        ),
     )
     
     @property
-    def average_cost_per_share(self) -> float:
+    def average_cost_per_share(self) -> Decimal:
         """Calculate average cost per share"""
-        if self.shares and float(self.shares) > 0:
-            return float(self.cost_basis) / float(self.shares)
-        return 0.0
+        if self.shares and self.shares > 0:
+            return self.cost_basis / self.shares
+        return Decimal("0")
     
     @property
-    def current_price_per_share(self) -> Optional[float]:
+    def current_price_per_share(self) -> Optional[Decimal]:
         """Calculate current price per share"""
-        if self.market_value and self.shares and float(self.shares) > 0:
-            return float(self.market_value) / float(self.shares)
+        if self.market_value and self.shares and self.shares > 0:
+            return self.market_value / self.shares
         return None
     
     @property
-    def unrealized_gain_loss(self) -> Optional[float]:
+    def unrealized_gain_loss(self) -> Optional[Decimal]:
         """Calculate unrealized gain/loss"""
         if self.market_value:
-            return float(self.market_value) - float(self.cost_basis)
+            return self.market_value - self.cost_basis
         return None
     
     @property
-    def unrealized_gain_loss_percent(self) -> Optional[float]:
+    def unrealized_gain_loss_percent(self) -> Optional[Decimal]:
         """Calculate unrealized gain/loss percentage"""
-        if self.cost_basis and float(self.cost_basis) > 0 and self.unrealized_gain_loss is not None:
-            return (self.unrealized_gain_loss / float(self.cost_basis)) * 100
+        gain_loss = self.unrealized_gain_loss
+        if self.cost_basis and self.cost_basis > 0 and gain_loss is not None:
+            return gain_loss / self.cost_basis * 100
         return None
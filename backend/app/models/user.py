@@ -2,8 +2,9 @@
 User model for authentication and user management
 """
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.db.base import Base
+from app.db.types import EncryptedBinary
 from datetime import datetime
 
 
@@ -14,7 +15,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
-    plaid_access_token = Column(String, nullable=True)  # Encrypted in production
+    plaid_access_token = deferred(Column(EncryptedBinary, nullable=True))  # AES-GCM ciphertext, loaded on access
     full_name = Column(String, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
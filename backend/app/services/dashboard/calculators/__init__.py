@@ -4,10 +4,13 @@ Calculator layer for dashboard metrics (pure functions, no DB access)
 from app.services.dashboard.calculators.totals import TotalsCalculator
 from app.services.dashboard.calculators.performance import PerformanceCalculator
 from app.services.dashboard.calculators.allocation import AllocationCalculator
+from app.services.dashboard.calculators.cash import CashPrefix, build_cash_prefix
 
 __all__ = [
     "TotalsCalculator",
     "PerformanceCalculator",
     "AllocationCalculator",
+    "CashPrefix",
+    "build_cash_prefix",
 ]
 
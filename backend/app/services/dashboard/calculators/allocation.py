@@ -15,20 +15,22 @@ class AllocationCalculator:
         """
         Group positions by asset_type, sum values and compute percentages.
         
+        Legacy in-memory path for callers that already hold snapshots; when
+        reading from the database use queries.positions.get_allocation_by_asset_type.
+        
         Args:
             snapshots: List of position snapshots
         
         Returns:
             List of allocation items sorted by value descending
         """
-        # Group by asset type
+        # Group by asset type (single dict update per row; total summed per group)
         by_type = defaultdict(float)
-        total = 0.0
         
         for snapshot in snapshots:
-            asset_type = snapshot.asset_type or "OTHER"
-            by_type[asset_type] += snapshot.value
-            total += snapshot.value
+            by_type[snapshot.asset_type or "OTHER"] += snapshot.value
+        
+        total = sum(by_type.values())
         
         # Convert to list of dicts with percentages
         result = []
@@ -0,0 +1,47 @@
+"""
+Cumulative cash-flow prefix shared by the totals and performance calculators
+"""
+from typing import List, Tuple
+from datetime import datetime
+from dataclasses import dataclass
+from bisect import bisect_right
+from itertools import accumulate
+from operator import attrgetter
+
+from app.services.dashboard.queries.dividends import CashFlowSnapshot
+
+
+@dataclass
+class CashPrefix:
+    """Running cash total per timestamp, in chronological order"""
+    timestamps: List[datetime]
+    cumulative: List[float]
+    
+    def total_through(self, end_timestamp: datetime) -> float:
+        """Cumulative cash up to and including end_timestamp"""
+        cutoff = bisect_right(self.timestamps, end_timestamp)
+        return self.cumulative[cutoff - 1] if cutoff else 0.0
+    
+    def points(self) -> List[Tuple[datetime, float]]:
+        """(timestamp, cumulative) pairs for charting, unrounded"""
+        return list(zip(self.timestamps, self.cumulative))
+
+
+def build_cash_prefix(cash_flows: List[CashFlowSnapshot]) -> CashPrefix:
+    """
+    Sort and accumulate cash flows once.
+    
+    When several flows share a timestamp the last running total wins.
+    
+    Args:
+        cash_flows: Cash flow snapshots in any order
+    
+    Returns:
+        CashPrefix with one entry per distinct timestamp
+    """
+    ordered = sorted(cash_flows, key=attrgetter("timestamp"))
+    running = dict(zip(
+        (c.timestamp for c in ordered),
+        accumulate(c.amount for c in ordered),
+    ))
+    return CashPrefix(timestamps=list(running), cumulative=list(running.values()))
@@ -1,12 +1,35 @@
 """
 Performance calculator for time series and returns
 """
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Tuple
 from datetime import datetime
-from collections import defaultdict
 
 from app.services.dashboard.queries.positions import PositionSnapshot
 from app.services.dashboard.queries.dividends import CashFlowSnapshot
+from app.services.dashboard.calculators.cash import CashPrefix, build_cash_prefix
+from app.services.dashboard.models.dashboard_models import TimeSeriesPoint
+
+
+def _min_max(values: Iterable[float]) -> Tuple[float, float]:
+    """Min and max of a non-empty iterable in a single pass"""
+    iterator = iter(values)
+    low = high = next(iterator)
+    for value in iterator:
+        if value < low:
+            low = value
+        elif value > high:
+            high = value
+    return low, high
+
+
+def _to_series(points: List[Tuple[datetime, float]]) -> List[TimeSeriesPoint]:
+    """
+    Convert (timestamp, value) pairs to series points (trusted values, validation skipped).
+    
+    This is the only place series values are rounded.
+    """
+    construct = TimeSeriesPoint.model_construct
+    return [construct(timestamp=timestamp, value=round(value, 2)) for timestamp, value in points]
 
 
 class PerformanceCalculator:
@@ -16,7 +39,7 @@ class PerformanceCalculator:
     def calculate_series(
         daily_snapshots: List[PositionSnapshot],
         cash_flows: Optional[List[CashFlowSnapshot]] = None,
-    ) -> Dict[str, List[Dict]]:
+    ) -> Dict[str, List[TimeSeriesPoint]]:
         """
         Aggregate daily snapshots into time series with optional cash flows.
         
@@ -33,48 +56,9 @@ class PerformanceCalculator:
             - 'position_series': Position values only
             - 'cash_series': Cumulative cash flows only
         """
-        # Group positions by timestamp
-        position_by_timestamp = defaultdict(float)
-        
-        for snapshot in daily_snapshots:
-            position_by_timestamp[snapshot.timestamp] += snapshot.value
-        
-        # Build position series
-        position_series = [
-            {
-                "timestamp": timestamp,
-                "value": round(total_value, 2),
-            }
-            for timestamp, total_value in sorted(position_by_timestamp.items())
-        ]
-        
-        # Build cash flow series (cumulative)
-        cash_series = []
-        if cash_flows:
-            # Sort cash flows by timestamp
-            sorted_cash_flows = sorted(cash_flows, key=lambda x: x.timestamp)
-            
-            cumulative_cash = 0.0
-            cash_by_timestamp = {}
-            
-            for cash_flow in sorted_cash_flows:
-                cumulative_cash += cash_flow.amount
-                cash_by_timestamp[cash_flow.timestamp] = cumulative_cash
-            
-            cash_series = [
-                {
-                    "timestamp": timestamp,
-                    "value": round(cumulative_value, 2),
-                }
-                for timestamp, cumulative_value in sorted(cash_by_timestamp.items())
-            ]
-        
-        # Combine into total series
-        # Merge position and cash timestamps, filling gaps with last known value
-        total_series = PerformanceCalculator._merge_series(
-            position_series, cash_series
+        total_series, position_series, cash_series, _, _ = PerformanceCalculator.build_all(
+            daily_snapshots, cash_flows
         )
-        
         return {
             "total_series": total_series,
             "position_series": position_series,
@@ -82,60 +66,137 @@ class PerformanceCalculator:
         }
     
     @staticmethod
-    def _merge_series(
-        position_series: List[Dict],
-        cash_series: List[Dict],
-    ) -> List[Dict]:
+    def build_all(
+        daily_snapshots: Optional[List[PositionSnapshot]] = None,
+        cash_flows: Optional[List[CashFlowSnapshot]] = None,
+        cash_prefix: Optional[CashPrefix] = None,
+        daily_totals: Optional[List[Tuple[datetime, float]]] = None,
+    ) -> Tuple[List[TimeSeriesPoint], List[TimeSeriesPoint], List[TimeSeriesPoint], Dict[str, float], Tuple[float, float]]:
         """
-        Merge position and cash series, filling gaps with last known value.
+        Build all series plus stats and delta in a single pass over the merge.
         
-        Ensures deterministic outputs by handling missing days.
+        Min/max are tracked while forward-filling, and the delta only needs the
+        first and last totals, so no extra scans over the total series are made.
         
         Args:
-            position_series: Position value series
-            cash_series: Cumulative cash flow series
+            daily_snapshots: List of position snapshots
+            cash_flows: Optional list of cash flow snapshots
+            cash_prefix: Prebuilt cumulative cash (takes precedence over cash_flows)
+            daily_totals: Pre-aggregated chronological (timestamp, position total)
+                pairs; skips grouping daily_snapshots when given
         
         Returns:
-            Combined series with total = positions + cash
+            Tuple of (total_series, position_series, cash_series, stats, delta)
+            where stats is calculate_stats before rounding and delta matches
+            calculate_delta; series values are rounded to cents
         """
-        if not position_series and not cash_series:
-            return []
+        # Work on (timestamp, value) pairs; points are only built at the edge
+        if daily_totals is not None:
+            position_points = daily_totals
+        else:
+            position_points = PerformanceCalculator._aggregate(daily_snapshots or [])
+        if cash_prefix is None and cash_flows:
+            cash_prefix = build_cash_prefix(cash_flows)
+        cash_points = cash_prefix.points() if cash_prefix else []
         
-        # Get all unique timestamps
-        all_timestamps = set()
-        for point in position_series:
-            all_timestamps.add(point["timestamp"])
-        for point in cash_series:
-            all_timestamps.add(point["timestamp"])
+        # Merge position and cash timestamps, filling gaps with last known value
+        total_points, stats = PerformanceCalculator._merge_series(position_points, cash_points)
+        
+        position_series = _to_series(position_points)
+        cash_series = _to_series(cash_points)
+        # When one side is empty the merge hands that input back; share its points
+        if total_points is position_points:
+            total_series = position_series
+        elif total_points is cash_points:
+            total_series = cash_series
+        else:
+            total_series = _to_series(total_points)
+        
+        return (
+            total_series,
+            position_series,
+            cash_series,
+            stats,
+            PerformanceCalculator.calculate_delta(total_series),
+        )
+    
+    @staticmethod
+    def _aggregate(snapshots: List[PositionSnapshot]) -> List[Tuple[datetime, float]]:
+        """
+        Sum snapshot values per timestamp, in chronological order (unrounded).
+        
+        Timestamps and values are pulled into flat lists once so the grouping
+        loop touches no attributes; a single dict does the group-by.
+        """
+        timestamps = [s.timestamp for s in snapshots]
+        values = [s.value for s in snapshots]
+        
+        sums: Dict[datetime, float] = dict.fromkeys(timestamps, 0.0)
+        for timestamp, value in zip(timestamps, values):
+            sums[timestamp] += value
+        
+        return [(timestamp, sums[timestamp]) for timestamp in sorted(sums)]
+    
+    @staticmethod
+    def _merge_series(
+        position_points: List[Tuple[datetime, float]],
+        cash_points: List[Tuple[datetime, float]],
+    ) -> Tuple[List[Tuple[datetime, float]], Dict[str, float]]:
+        """
+        Merge position and cash points, filling gaps with last known value.
         
-        sorted_timestamps = sorted(all_timestamps)
+        Ensures deterministic outputs by handling missing days. Min/max of the
+        merged totals are tracked in the same loop.
         
-        # Build lookup maps
-        position_map = {p["timestamp"]: p["value"] for p in position_series}
-        cash_map = {c["timestamp"]: c["value"] for c in cash_series}
+        Args:
+            position_points: Position value (timestamp, value) pairs, sorted
+            cash_points: Cumulative cash flow (timestamp, value) pairs, sorted
         
-        # Build merged series with forward-fill for missing days
+        Returns:
+            Tuple of (combined (timestamp, value) pairs with total = positions + cash,
+            stats dict with max, min values), all unrounded
+        """
+        if not position_points and not cash_points:
+            return [], {"max": 0.0, "min": 0.0}
+        
+        # One side empty (e.g. no dividends in range): nothing to merge or fill
+        if not position_points or not cash_points:
+            points = position_points or cash_points
+            low, high = _min_max(value for _, value in points)
+            return points, {"max": high, "min": low}
+        
+        # Two-pointer merge of the already-sorted inputs, forward-filling each side
         merged = []
         last_position = 0.0
         last_cash = 0.0
-        
-        for timestamp in sorted_timestamps:
-            # Forward-fill: use last known value if missing
-            if timestamp in position_map:
-                last_position = position_map[timestamp]
-            if timestamp in cash_map:
-                last_cash = cash_map[timestamp]
+        low = float("inf")
+        high = float("-inf")
+        i = j = 0
+        n_position, n_cash = len(position_points), len(cash_points)
+        
+        while i < n_position or j < n_cash:
+            if j == n_cash or (i < n_position and position_points[i][0] <= cash_points[j][0]):
+                timestamp, last_position = position_points[i]
+                i += 1
+                # Same timestamp on both sides collapses into one point
+                if j < n_cash and cash_points[j][0] == timestamp:
+                    last_cash = cash_points[j][1]
+                    j += 1
+            else:
+                timestamp, last_cash = cash_points[j]
+                j += 1
             
-            total_value = last_position + last_cash
-            merged.append({
-                "timestamp": timestamp,
-                "value": round(total_value, 2),
-            })
-        
-        return merged
+            total = last_position + last_cash
+            merged.append((timestamp, total))
+            if total < low:
+                low = total
+            if total > high:
+                high = total
+        
+        return merged, {"max": high, "min": low}
     
     @staticmethod
-    def calculate_stats(series: List[Dict]) -> Dict[str, float]:
+    def calculate_stats(series: List[TimeSeriesPoint]) -> Dict[str, float]:
         """
         Extract performance statistics from time series.
         
@@ -148,15 +209,11 @@ class PerformanceCalculator:
         if not series:
             return {"max": 0.0, "min": 0.0}
         
-        values = [point["value"] for point in series]
-        
-        return {
-            "max": max(values),
-            "min": min(values),
-        }
+        low, high = _min_max(point.value for point in series)
+        return {"max": high, "min": low}
     
     @staticmethod
-    def calculate_delta(series: List[Dict]) -> tuple:
+    def calculate_delta(series: List[TimeSeriesPoint]) -> tuple:
         """
         Calculate absolute and percent delta from series.
         
@@ -169,8 +226,8 @@ class PerformanceCalculator:
         if not series or len(series) < 2:
             return 0.0, 0.0
         
-        start_value = series[0]["value"]
-        end_value = series[-1]["value"]
+        start_value = series[0].value
+        end_value = series[-1].value
         
         absolute_delta = end_value - start_value
         
@@ -6,6 +6,7 @@ from datetime import datetime
 
 from app.services.dashboard.queries.positions import PositionSnapshot
 from app.services.dashboard.queries.dividends import CashFlowSnapshot
+from app.services.dashboard.calculators.cash import CashPrefix, build_cash_prefix
 
 
 class TotalsCalculator:
@@ -17,6 +18,7 @@ class TotalsCalculator:
         end_snapshots: List[PositionSnapshot],
         cash_flows: Optional[List[CashFlowSnapshot]] = None,
         end_timestamp: Optional[datetime] = None,
+        cash_prefix: Optional[CashPrefix] = None,
     ) -> Tuple[float, float, float, float]:
         """
         Calculate total portfolio values and deltas including cash flows.
@@ -29,21 +31,47 @@ class TotalsCalculator:
             end_snapshots: Position snapshots at range end
             cash_flows: Optional list of cash flow snapshots
             end_timestamp: End timestamp for cash flow filtering
+            cash_prefix: Prebuilt cumulative cash (takes precedence over cash_flows)
         
         Returns:
             Tuple of (start_value, end_value, absolute_delta, percent_delta)
         """
-        # Calculate position values
-        start_value = sum(s.value for s in start_snapshots)
-        end_position_value = sum(s.value for s in end_snapshots)
+        return TotalsCalculator.calculate_from_values(
+            sum(s.value for s in start_snapshots),
+            sum(s.value for s in end_snapshots),
+            cash_flows=cash_flows,
+            end_timestamp=end_timestamp,
+            cash_prefix=cash_prefix,
+        )
+    
+    @staticmethod
+    def calculate_from_values(
+        start_value: float,
+        end_position_value: float,
+        cash_flows: Optional[List[CashFlowSnapshot]] = None,
+        end_timestamp: Optional[datetime] = None,
+        cash_prefix: Optional[CashPrefix] = None,
+    ) -> Tuple[float, float, float, float]:
+        """
+        Same as calculate, for position totals already summed (e.g. by SQL).
         
+        Args:
+            start_value: Position value at range start
+            end_position_value: Position value at range end
+            cash_flows: Optional list of cash flow snapshots
+            end_timestamp: End timestamp for cash flow filtering
+            cash_prefix: Prebuilt cumulative cash (takes precedence over cash_flows)
+        
+        Returns:
+            Tuple of (start_value, end_value, absolute_delta, percent_delta)
+        """
         # Calculate cumulative cash flows up to end timestamp
+        # Cumulative cash is a binary search into the running totals
         cumulative_cash = 0.0
-        if cash_flows and end_timestamp:
-            for cash_flow in cash_flows:
-                # Only include cash flows up to end timestamp
-                if cash_flow.timestamp <= end_timestamp:
-                    cumulative_cash += cash_flow.amount
+        if cash_prefix is None and cash_flows:
+            cash_prefix = build_cash_prefix(cash_flows)
+        if cash_prefix and end_timestamp:
+            cumulative_cash = cash_prefix.total_through(end_timestamp)
         
         # Total end value = positions + cumulative cash
         end_value = end_position_value + cumulative_cash
@@ -1,9 +1,19 @@
 """
 Dashboard service orchestrator
 """
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, count
+from operator import attrgetter
+import heapq
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.dividend import Dividend
+from app.models.position import Position
 
 from app.services.dashboard.models.time_range import TimeRange
 from app.services.dashboard.models.dashboard_models import (
@@ -12,7 +22,6 @@ from app.services.dashboard.models.dashboard_models import (
     PerformanceMetrics,
     MetricDelta,
     AllocationItem,
-    TimeSeriesPoint,
     ActivityItem,
 )
 from app.services.dashboard.queries import positions as position_queries
@@ -20,12 +29,124 @@ from app.services.dashboard.queries import dividends as dividend_queries
 from app.services.dashboard.queries import activity as activity_queries
 from app.services.dashboard.calculators.totals import TotalsCalculator
 from app.services.dashboard.calculators.performance import PerformanceCalculator
-from app.services.dashboard.calculators.allocation import AllocationCalculator
+from app.services.dashboard.calculators.cash import build_cash_prefix
+
+
+# Short-lived cache of assembled dashboards (page refreshes, polling)
+_DASHBOARD_CACHE_TTL_SECONDS = 30
+_dashboard_cache = TTLCache(ttl=_DASHBOARD_CACHE_TTL_SECONDS)
+
+# Per-user data version; bumping it orphans that user's cached dashboards
+_data_versions: Dict[int, int] = {}
+_version_counter = count(1)
+
+# Session.info key collecting users whose dashboard data changed this transaction
+_CHANGED_USERS_KEY = "dashboard_changed_user_ids"
+
+# Built once; _empty_dashboard stamps a fresh as_of on a copy
+_EMPTY_DASHBOARD = DashboardSnapshot(
+    as_of=datetime.min,
+    total=TotalMetrics(
+        current=0.0,
+        start=0.0,
+        delta=MetricDelta(absolute=0.0, percent=0.0),
+    ),
+    performance=PerformanceMetrics(
+        series=[],
+        position_series=None,
+        cash_series=None,
+        delta=MetricDelta(absolute=0.0, percent=0.0),
+        max=0.0,
+        min=0.0,
+    ),
+    allocation=[],
+    activity=[],
+)
+
+
+def _to_minute(value: Optional[datetime]) -> Optional[datetime]:
+    """Truncate a timestamp to the minute for cache keys"""
+    return value.replace(second=0, microsecond=0) if value else None
+
+
+# Shared across requests; each worker checks out one connection from the engine
+# in app/db/session.py, so the pool is sized from its pool_size rather than a
+# fixed count (leaving max_overflow for the request sessions themselves)
+_QUERY_WORKERS = settings.DASHBOARD_QUERY_WORKERS or settings.DB_POOL_SIZE
+_query_pool = ThreadPoolExecutor(max_workers=_QUERY_WORKERS, thread_name_prefix="dashboard-query")
+
+
+def _run_queries(db: Session, *queries: Callable[[Session], Any]) -> List[Any]:
+    """
+    Run independent read queries concurrently and return results in order.
+    
+    Sessions are not thread-safe, so each query gets its own short-lived
+    session bound to the same engine as db.
+    """
+    bind = db.get_bind()
+    
+    def run(query: Callable[[Session], Any]) -> Any:
+        session = Session(bind=bind)
+        try:
+            return query(session)
+        finally:
+            session.close()
+    
+    futures = [_query_pool.submit(run, query) for query in queries]
+    return [future.result() for future in futures]
 
 
 class DashboardService:
     """Orchestrator: validates, queries, calculates, assembles."""
     
+    @staticmethod
+    def get_dashboard(
+        db: Session,
+        user_id: int,
+        time_range: TimeRange,
+    ) -> DashboardSnapshot:
+        """
+        Cached build_dashboard for request handlers.
+        
+        Live ranges end at "now", so start/end are bucketed to the minute to
+        let repeated requests share an entry. Entries live for
+        _DASHBOARD_CACHE_TTL_SECONDS or until the user's positions/dividends
+        change (see invalidate and invalidate_on_commit).
+        
+        Args:
+            db: SQLAlchemy session
+            user_id: User identifier
+            time_range: TimeRange object (from shorthand or custom)
+        
+        Returns:
+            DashboardSnapshot (shared between callers; treat as read-only)
+        """
+        key = (
+            user_id,
+            _data_versions.get(user_id, 0),
+            time_range.granularity,
+            _to_minute(time_range.start_date),
+            _to_minute(time_range.end_date),
+        )
+        return _dashboard_cache.get_or_load(
+            key, lambda: DashboardService.build_dashboard(db, user_id, time_range)
+        )
+    
+    @staticmethod
+    def invalidate(user_id: int) -> None:
+        """Drop cached dashboards for a user after their data changes"""
+        _data_versions[user_id] = next(_version_counter)
+    
+    @staticmethod
+    def invalidate_on_commit(db: Session, user_id: int) -> None:
+        """
+        Invalidate a user's dashboards once db's transaction commits.
+        
+        ORM writes to Position/Dividend are picked up automatically; call this
+        for Core statements (bulk inserts/upserts) that bypass the unit of work.
+        """
+        db.info.setdefault(_CHANGED_USERS_KEY, set()).add(user_id)
+    
     @staticmethod
     def build_dashboard(
         db: Session,
@@ -36,12 +157,14 @@ class DashboardService:
         Main public API for building dashboard snapshot.
         
         Orchestration flow:
-        1. Queries positions → start, end, daily snapshots
+        1. Queries positions → daily totals and allocation (aggregated in SQL);
+           start and end totals are the first and last daily totals
         2. Queries dividends/interest → daily snapshots
         3. Queries activity → trades, paid dividends, upcoming dividends
+           (steps 1-3 run concurrently on separate sessions)
         4. Calls TotalsCalculator with positions + cash flows
         5. Calls PerformanceCalculator with positions + cash flows
-        6. Calls AllocationCalculator with positions only
+        6. Allocation comes from the positions query (positions only)
         7. Assembles updated DashboardSnapshot DTO with activity feed
         
         Args:
@@ -59,109 +182,93 @@ class DashboardService:
         if not user_id:
             raise ValueError("user_id required")
         
-        # Query layer: get raw position data
-        start_snapshots = position_queries.get_position_snapshots(
-            db, user_id, time_range.start_date, time_range.end_date
-        )
-        end_snapshots = position_queries.get_position_snapshots(
-            db, user_id, time_range.end_date, time_range.end_date
-        )
-        daily_snapshots = position_queries.get_daily_position_snapshots(
-            db, user_id, time_range.start_date, time_range.end_date
-        )
-        
-        # Query layer: get cash flows (dividends/interest)
-        cash_flows = dividend_queries.get_daily_cash_flow_snapshots(
-            db, user_id, time_range.start_date, time_range.end_date
-        )
+        start_date, end_date = time_range.start_date, time_range.end_date
+        # Single timestamp for the upcoming-dividend cutoff and the snapshot itself
+        as_of = datetime.utcnow()
         
-        # Query layer: get activity items (trades, dividends, upcoming dividends)
-        activity_items = []
-        
-        # Get trades (currently returns empty - placeholder for future Transaction model)
-        trades = activity_queries.get_trades(
-            db, user_id, time_range.start_date, time_range.end_date
-        )
-        activity_items.extend(trades)
-        
-        # Get paid dividends
-        paid_dividends = activity_queries.get_paid_dividends(
-            db, user_id, time_range.start_date, time_range.end_date
-        )
-        activity_items.extend(paid_dividends)
-        
-        # Get upcoming dividends (as of current time)
-        upcoming_dividends = activity_queries.get_upcoming_dividends(
-            db, user_id, as_of=datetime.utcnow()
+        # Query layer: independent queries run concurrently, each on its own session
+        (
+            daily_totals,  # position value per day, summed in SQL
+            allocation_data,  # latest-day holdings grouped by asset type
+            cash_flows,  # dividends/interest
+            (paid_dividends, upcoming_dividends),  # one query; upcoming as of current time
+            *trades,  # [trade items] when TRADES_ENABLED, else nothing is queried
+        ) = _run_queries(
+            db,
+            lambda s: position_queries.get_daily_portfolio_totals(s, user_id, start_date, end_date),
+            lambda s: position_queries.get_allocation_by_asset_type(s, user_id, end_date),
+            lambda s: dividend_queries.get_daily_cash_flow_snapshots(s, user_id, start_date, end_date),
+            lambda s: activity_queries.get_dividend_activity(s, user_id, start_date, end_date, as_of),
+            *(
+                [lambda s: activity_queries.get_trades(s, user_id, start_date, end_date)]
+                if activity_queries.TRADES_ENABLED else []
+            ),
         )
-        activity_items.extend(upcoming_dividends)
         
-        # Sort all activity items chronologically
-        activity_items.sort(key=lambda x: x.timestamp)
+        # Activity items: each query returns its items chronologically, so a
+        # linear merge gives the sorted feed
+        activity_items = list(heapq.merge(
+            *trades, paid_dividends, upcoming_dividends, key=attrgetter("timestamp")
+        ))
         
         # Handle edge case: empty portfolio
-        if not end_snapshots and not cash_flows:
-            return DashboardService._empty_dashboard()
+        if not allocation_data and not cash_flows:
+            return DashboardService._empty_dashboard(as_of)
         
         # Calculators: pure math
+        # Sort and accumulate cash flows once for both calculators
+        # (positions-only users skip the prefix entirely)
+        cash_prefix = build_cash_prefix(cash_flows) if cash_flows else None
+        
+        # End total: the last daily total already sums the latest day's holdings,
+        # unless the range opens on that day (its earlier snapshots fall outside)
+        if daily_totals and (start_date is None or start_date.date() < daily_totals[-1][0].date()):
+            end_position_value = daily_totals[-1][1]
+        elif allocation_data:
+            end_position_value = position_queries.get_position_total(db, user_id, end_date)
+        else:
+            end_position_value = 0.0
+        
         # TotalsCalculator with positions + cash flows
-        start_val, end_val, abs_delta, pct_delta = TotalsCalculator.calculate(
-            start_snapshots if start_snapshots else end_snapshots,
-            end_snapshots,
-            cash_flows=cash_flows,
-            end_timestamp=time_range.end_date
+        # (start is the first day of the range; with nothing in range, the
+        # latest earlier holdings stand in for both ends)
+        start_val, end_val, abs_delta, pct_delta = TotalsCalculator.calculate_from_values(
+            daily_totals[0][1] if daily_totals else end_position_value,
+            end_position_value,
+            end_timestamp=time_range.end_date,
+            cash_prefix=cash_prefix,
         )
         
         # Performance metrics with positions + cash flows
-        series_data = PerformanceCalculator.calculate_series(
-            daily_snapshots,
-            cash_flows=cash_flows
+        # (series, stats and delta come out of one pass over the merged series)
+        (
+            total_series,
+            position_series,
+            cash_series,
+            perf_stats,
+            (perf_abs_delta, perf_pct_delta),
+        ) = PerformanceCalculator.build_all(
+            daily_totals=daily_totals, cash_prefix=cash_prefix
         )
         
-        total_series = series_data["total_series"]
-        position_series = series_data.get("position_series", [])
-        cash_series = series_data.get("cash_series", [])
-        
-        perf_stats = PerformanceCalculator.calculate_stats(total_series)
-        perf_abs_delta, perf_pct_delta = PerformanceCalculator.calculate_delta(total_series)
-        
-        # Allocation (positions only, not including cash)
-        allocation_data = AllocationCalculator.calculate(end_snapshots)
-        
         # Assemble response DTO
-        return DashboardSnapshot(
-            as_of=datetime.utcnow(),
-            total=TotalMetrics(
+        # Every value comes from our own queries/calculators with the declared
+        # types, so validation is skipped with model_construct
+        return DashboardSnapshot.model_construct(
+            as_of=as_of,
+            total=TotalMetrics.model_construct(
                 current=round(end_val, 2),
                 start=round(start_val, 2),
-                delta=MetricDelta(
+                delta=MetricDelta.model_construct(
                     absolute=round(abs_delta, 2),
                     percent=round(pct_delta, 2)
                 ),
             ),
-            performance=PerformanceMetrics(
-                series=[
-                    TimeSeriesPoint(
-                        timestamp=point["timestamp"],
-                        value=point["value"]
-                    )
-                    for point in total_series
-                ],
-                position_series=[
-                    TimeSeriesPoint(
-                        timestamp=point["timestamp"],
-                        value=point["value"]
-                    )
-                    for point in position_series
-                ] if position_series else None,
-                cash_series=[
-                    TimeSeriesPoint(
-                        timestamp=point["timestamp"],
-                        value=point["value"]
-                    )
-                    for point in cash_series
-                ] if cash_series else None,
-                delta=MetricDelta(
+            performance=PerformanceMetrics.model_construct(
+                series=total_series,
+                position_series=position_series or None,
+                cash_series=cash_series or None,
+                delta=MetricDelta.model_construct(
                     absolute=round(perf_abs_delta, 2),
                     percent=round(perf_pct_delta, 2)
                 ),
@@ -169,7 +276,7 @@ class DashboardService:
                 min=round(perf_stats["min"], 2),
             ),
             allocation=[
-                AllocationItem(
+                AllocationItem.model_construct(
                     asset_type=item["asset_type"],
                     value=item["value"],
                     percent=item["percent"],
@@ -177,7 +284,7 @@ class DashboardService:
                 for item in allocation_data
             ],
             activity=[
-                ActivityItem(
+                ActivityItem.model_construct(
                     timestamp=item.timestamp,
                     activity_type=item.activity_type.value,
                     position_id=item.position_id,
@@ -193,24 +300,30 @@ class DashboardService:
         )
     
     @staticmethod
-    def _empty_dashboard() -> DashboardSnapshot:
+    def _empty_dashboard(as_of: Optional[datetime] = None) -> DashboardSnapshot:
         """Return empty dashboard for users with no positions"""
-        now = datetime.now()
-        return DashboardSnapshot(
-            as_of=now,
-            total=TotalMetrics(
-                current=0.0,
-                start=0.0,
-                delta=MetricDelta(absolute=0.0, percent=0.0),
-            ),
-            performance=PerformanceMetrics(
-                series=[],
-                position_series=None,
-                cash_series=None,
-                delta=MetricDelta(absolute=0.0, percent=0.0),
-                max=0.0,
-                min=0.0,
-            ),
-            allocation=[],
-            activity=[],
-        )
+        # Shallow copy: only as_of differs, the zeroed sections are shared
+        return _EMPTY_DASHBOARD.model_copy(update={"as_of": as_of or datetime.utcnow()})
+
+
+# Invalidate after commit rather than at write time, so a concurrent build
+# cannot re-cache pre-commit data under the new version
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    """Record users whose positions or dividends were written in this flush"""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, (Position, Dividend)) and obj.user_id is not None:
+            session.info.setdefault(_CHANGED_USERS_KEY, set()).add(obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    """Invalidate dashboards for users whose data just committed"""
+    for user_id in session.info.pop(_CHANGED_USERS_KEY, ()):
+        DashboardService.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    """Rolled-back writes leave cached dashboards valid"""
+    session.info.pop(_CHANGED_USERS_KEY, None)
@@ -2,7 +2,7 @@
 TimeRange value object for dashboard time period selection
 """
 from enum import Enum
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 from typing import Optional
 
@@ -14,6 +14,13 @@ class TimeGranularity(str, Enum):
     MONTHLY = "monthly"
 
 
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC; naive values pass through"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 @dataclass
 class TimeRange:
     """Value object representing a time range for dashboard queries"""
@@ -23,6 +30,11 @@ class TimeRange:
     
     def __post_init__(self):
         """Validate time range"""
+        # Database timestamps are naive UTC; normalize aware inputs once here so
+        # queries and calculators only ever compare naive values
+        self.start_date = _to_naive_utc(self.start_date)
+        self.end_date = _to_naive_utc(self.end_date)
+        
         if self.start_date and self.start_date > self.end_date:
             raise ValueError("start_date must be <= end_date")
         if self.end_date > datetime.utcnow():
@@ -5,6 +5,9 @@ from app.services.dashboard.queries.positions import (
     PositionSnapshot,
     get_position_snapshots,
     get_daily_position_snapshots,
+    get_daily_portfolio_totals,
+    get_position_total,
+    get_allocation_by_asset_type,
 )
 from app.services.dashboard.queries.dividends import (
     CashFlowSnapshot,
@@ -17,12 +20,16 @@ from app.services.dashboard.queries.activity import (
     get_trades,
     get_paid_dividends,
     get_upcoming_dividends,
+    get_dividend_activity,
 )
 
 __all__ = [
     "PositionSnapshot",
     "get_position_snapshots",
     "get_daily_position_snapshots",
+    "get_daily_portfolio_totals",
+    "get_position_total",
+    "get_allocation_by_asset_type",
     "CashFlowSnapshot",
     "get_cash_flow_snapshots",
     "get_daily_cash_flow_snapshots",
@@ -31,5 +38,6 @@ __all__ = [
     "get_trades",
     "get_paid_dividends",
     "get_upcoming_dividends",
+    "get_dividend_activity",
 ]
 
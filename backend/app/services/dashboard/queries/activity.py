@@ -1,15 +1,21 @@
 """
 Activity query layer for dashboard - portfolio events (trades, dividends)
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, date
 from dataclasses import dataclass
 from enum import Enum
+from operator import attrgetter
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import Float, and_, case, cast, func, or_
 
 from app.models.dividend import Dividend, DividendStatus
 from app.models.position import Position
+from app.services.dashboard.queries.dividends import _midnight
+
+# get_trades is a placeholder until a Transaction model exists; callers skip
+# it entirely while this is False
+TRADES_ENABLED: bool = False
 
 
 class ActivityType(str, Enum):
@@ -20,7 +26,7 @@ class ActivityType(str, Enum):
     UPCOMING_DIVIDEND = "UPCOMING_DIVIDEND"
 
 
-@dataclass
+@dataclass(slots=True)
 class ActivityItem:
     """DTO for portfolio activity events"""
     timestamp: datetime
@@ -34,6 +40,23 @@ class ActivityItem:
     ticker: Optional[str] = None  # For display purposes
 
 
+# Columns read into dividend ActivityItems; asset_type comes from the
+# outer-joined position, so rows carry no ORM entities at all. Numeric
+# columns are cast to float (NULL as 0) by the database, not per row as Decimal
+_DIVIDEND_COLUMNS = (
+    Dividend.position_id,
+    Dividend.ticker,
+    cast(Dividend.amount, Float).label("amount"),
+    Dividend.pay_date,
+    Dividend.ex_date,
+    cast(func.coalesce(Dividend.shares_at_ex_date, 0), Float).label("shares_at_ex_date"),
+    Position.asset_type,
+)
+
+# Reads one row's fields in _DIVIDEND_COLUMNS order in a single call
+_dividend_fields = attrgetter(*(column.key for column in _DIVIDEND_COLUMNS))
+
+
 def get_trades(
     db: Session,
     user_id: int,
@@ -45,7 +68,8 @@ def get_trades(
     
     Note: Currently, trades are inferred from position changes or would come from
     Plaid investment transactions. For MVP, this returns empty list.
-    Future: When Transaction model exists, map DB rows to ActivityItem.
+    Future: When Transaction model exists, map DB rows to ActivityItem and
+    set TRADES_ENABLED.
     
     Args:
         db: SQLAlchemy session
@@ -71,7 +95,7 @@ def get_paid_dividends(
     """
     Return all dividends actually paid in the given range.
     
-    Maps Dividend model rows to ActivityItem DTOs.
+    Maps Dividend rows to ActivityItem DTOs.
     Handles empty results gracefully.
     
     Args:
@@ -83,7 +107,10 @@ def get_paid_dividends(
     Returns:
         List of ActivityItem objects for paid dividends, sorted chronologically
     """
-    query = db.query(Dividend).filter(
+    # Join each dividend's position in the same SELECT instead of one lookup per row
+    query = db.query(*_DIVIDEND_COLUMNS).outerjoin(
+        Position, Dividend.position
+    ).filter(
         and_(
             Dividend.user_id == user_id,
             Dividend.status == DividendStatus.PAID,
@@ -98,39 +125,7 @@ def get_paid_dividends(
     
     dividends = query.order_by(Dividend.pay_date).all()
     
-    activity_items = []
-    for div in dividends:
-        # Convert pay_date (Date) to datetime for timestamp
-        if isinstance(div.pay_date, date) and not isinstance(div.pay_date, datetime):
-            timestamp = datetime.combine(div.pay_date, datetime.min.time())
-        else:
-            timestamp = div.pay_date
-        
-        # Get asset_type from position if available
-        asset_type = None
-        if div.position_id:
-            position = db.query(Position).filter(Position.id == div.position_id).first()
-            if position:
-                asset_type = position.asset_type
-        
-        # Get ticker from dividend
-        ticker = div.ticker
-        
-        activity_items.append(
-            ActivityItem(
-                timestamp=timestamp,
-                activity_type=ActivityType.DIVIDEND,
-                position_id=div.position_id,
-                asset_type=asset_type,
-                quantity=float(div.shares_at_ex_date) if div.shares_at_ex_date else 0.0,
-                value=0.0,  # Dividends don't have a "value" in the trade sense
-                dividend_amount=float(div.amount) if div.amount else 0.0,
-                ex_date=datetime.combine(div.ex_date, datetime.min.time()) if div.ex_date else None,
-                ticker=ticker,
-            )
-        )
-    
-    return activity_items
+    return _paid_items(dividends)
 
 
 def get_upcoming_dividends(
@@ -141,7 +136,7 @@ def get_upcoming_dividends(
     """
     Return dividends with ex_date > as_of (upcoming dividends).
     
-    Maps Dividend model rows with status=UPCOMING to ActivityItem DTOs.
+    Maps Dividend rows with status=UPCOMING to ActivityItem DTOs.
     Handles empty results gracefully.
     
     Args:
@@ -155,7 +150,9 @@ def get_upcoming_dividends(
     # Convert as_of to date for comparison with ex_date (Date field)
     as_of_date = as_of.date() if isinstance(as_of, datetime) else as_of
     
-    query = db.query(Dividend).filter(
+    query = db.query(*_DIVIDEND_COLUMNS).outerjoin(
+        Position, Dividend.position
+    ).filter(
         and_(
             Dividend.user_id == user_id,
             Dividend.status == DividendStatus.UPCOMING,
@@ -166,43 +163,111 @@ def get_upcoming_dividends(
     
     dividends = query.order_by(Dividend.ex_date).all()
     
-    activity_items = []
-    for div in dividends:
-        # Use ex_date as timestamp for upcoming dividends
-        if div.ex_date:
-            if isinstance(div.ex_date, date) and not isinstance(div.ex_date, datetime):
-                timestamp = datetime.combine(div.ex_date, datetime.min.time())
-            else:
-                timestamp = div.ex_date
-        else:
-            # Fallback to pay_date if ex_date is missing
-            if isinstance(div.pay_date, date) and not isinstance(div.pay_date, datetime):
-                timestamp = datetime.combine(div.pay_date, datetime.min.time())
-            else:
-                timestamp = div.pay_date
-        
-        # Get asset_type from position if available
-        asset_type = None
-        if div.position_id:
-            position = db.query(Position).filter(Position.id == div.position_id).first()
-            if position:
-                asset_type = position.asset_type
-        
-        # Get ticker from dividend
-        ticker = div.ticker
-        
-        activity_items.append(
-            ActivityItem(
-                timestamp=timestamp,
-                activity_type=ActivityType.UPCOMING_DIVIDEND,
-                position_id=div.position_id,
-                asset_type=asset_type,
-                quantity=float(div.shares_at_ex_date) if div.shares_at_ex_date else 0.0,
-                value=0.0,  # Upcoming dividends don't have a "value" yet
-                dividend_amount=float(div.amount) if div.amount else 0.0,
-                ex_date=datetime.combine(div.ex_date, datetime.min.time()) if div.ex_date else None,
-                ticker=ticker,
-            )
+    return _upcoming_items(dividends)
+
+
+def get_dividend_activity(
+    db: Session,
+    user_id: int,
+    start_date: Optional[datetime],
+    end_date: datetime,
+    as_of: datetime,
+) -> Tuple[List[ActivityItem], List[ActivityItem]]:
+    """
+    Return paid and upcoming dividends from a single query.
+    
+    Same items as get_paid_dividends(start_date, end_date) and
+    get_upcoming_dividends(as_of), but both sets come back in one SELECT
+    and are split on status in one pass.
+    
+    Args:
+        db: SQLAlchemy session
+        user_id: User identifier
+        start_date: Start of time range (None for ALL)
+        end_date: End of time range
+        as_of: Current timestamp to compare against ex_date
+    
+    Returns:
+        (paid dividend items, upcoming dividend items), each sorted chronologically
+    """
+    paid = and_(
+        Dividend.status == DividendStatus.PAID,
+        Dividend.pay_date <= end_date
+    )
+    if start_date:
+        # Convert datetime to date for comparison with pay_date (Date field)
+        start_date_only = start_date.date() if isinstance(start_date, datetime) else start_date
+        paid = and_(paid, Dividend.pay_date >= start_date_only)
+    
+    # Convert as_of to date for comparison with ex_date (Date field)
+    as_of_date = as_of.date() if isinstance(as_of, datetime) else as_of
+    upcoming = and_(
+        Dividend.status == DividendStatus.UPCOMING,
+        Dividend.ex_date.isnot(None),
+        Dividend.ex_date > as_of_date
+    )
+    
+    # Paid rows order by pay_date and upcoming rows by ex_date, so each
+    # partition keeps the order its own query would have returned
+    activity_date = case(
+        (Dividend.status == DividendStatus.PAID, Dividend.pay_date),
+        else_=Dividend.ex_date,
+    )
+    
+    rows = db.query(*_DIVIDEND_COLUMNS, Dividend.status).outerjoin(
+        Position, Dividend.position
+    ).filter(
+        and_(
+            Dividend.user_id == user_id,
+            or_(paid, upcoming)
         )
+    ).order_by(activity_date).all()
+    
+    paid_rows = []
+    upcoming_rows = []
+    for row in rows:
+        (paid_rows if row.status == DividendStatus.PAID else upcoming_rows).append(row)
     
-    return activity_items
+    return _paid_items(paid_rows), _upcoming_items(upcoming_rows)
+
+
+def _paid_items(dividends) -> List[ActivityItem]:
+    """Map _DIVIDEND_COLUMNS rows of paid dividends to ActivityItem DTOs"""
+    # Dividends don't have a "value" in the trade sense; asset_type is None
+    # when the dividend has no joined position
+    return [
+        ActivityItem(
+            timestamp=_midnight(pay_date),
+            activity_type=ActivityType.DIVIDEND,
+            position_id=position_id,
+            asset_type=asset_type,
+            quantity=shares,
+            value=0.0,
+            dividend_amount=amount,
+            ex_date=_midnight(ex_date) if ex_date else None,
+            ticker=ticker,
+        )
+        for position_id, ticker, amount, pay_date, ex_date, shares, asset_type
+        in map(_dividend_fields, dividends)
+    ]
+
+
+def _upcoming_items(dividends) -> List[ActivityItem]:
+    """Map _DIVIDEND_COLUMNS rows of upcoming dividends to ActivityItem DTOs"""
+    # Timestamped at ex_date (pay_date if it is missing); upcoming dividends
+    # don't have a "value" yet
+    return [
+        ActivityItem(
+            timestamp=_midnight(ex_date or pay_date),
+            activity_type=ActivityType.UPCOMING_DIVIDEND,
+            position_id=position_id,
+            asset_type=asset_type,
+            quantity=shares,
+            value=0.0,
+            dividend_amount=amount,
+            ex_date=_midnight(ex_date) if ex_date else None,
+            ticker=ticker,
+        )
+        for position_id, ticker, amount, pay_date, ex_date, shares, asset_type
+        in map(_dividend_fields, dividends)
+    ]
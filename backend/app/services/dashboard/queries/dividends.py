@@ -2,15 +2,16 @@
 Dividend query layer for dashboard - returns cash flow snapshots
 """
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, date
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import Float, and_, cast, func
 
 from app.models.dividend import Dividend
+from app.services.dashboard.queries.positions import _STREAM_BATCH_SIZE
 
 
-@dataclass
+@dataclass(slots=True)
 class CashFlowSnapshot:
     """DTO for cash flow events (dividends/interest)"""
     position_id: Optional[int]
@@ -70,7 +71,13 @@ def get_cash_flow_snapshots(
     Returns:
         List of CashFlowSnapshot objects, ordered by timestamp
     """
-    query = db.query(Dividend).filter(
+    # Only the columns the DTO needs, amount already a float; no Dividend
+    # entities are hydrated
+    query = db.query(
+        Dividend.position_id,
+        Dividend.pay_date,
+        cast(Dividend.amount, Float),
+    ).filter(
         and_(
             Dividend.user_id == user_id,
             Dividend.pay_date <= end_date
@@ -80,31 +87,18 @@ def get_cash_flow_snapshots(
     if start_date:
         query = query.filter(Dividend.pay_date >= start_date)
     
-    dividends = query.order_by(Dividend.pay_date).all()
-    
-    # Convert to CashFlowSnapshot DTOs
-    snapshots = []
-    for div in dividends:
-        # Use pay_date as timestamp for cash flow
-        # Convert Date to datetime for consistency
-        if isinstance(div.pay_date, datetime):
-            timestamp = div.pay_date
-        else:
-            # Convert date to datetime at midnight
-            timestamp = datetime.combine(div.pay_date, datetime.min.time())
-        
-        # Amount is positive for dividends received
-        amount = float(div.amount) if div.amount else 0.0
-        
-        snapshots.append(
-            CashFlowSnapshot(
-                position_id=div.position_id,
-                timestamp=timestamp,
-                amount=amount
-            )
-        )
+    # Streamed in batches rather than .all(), since an ALL range can span years
+    dividends = query.order_by(Dividend.pay_date).yield_per(_STREAM_BATCH_SIZE)
     
-    return snapshots
+    # Use pay_date as the cash flow timestamp; amount is positive for dividends received
+    return [
+        CashFlowSnapshot(
+            position_id=position_id,
+            timestamp=_midnight(pay_date),
+            amount=amount,
+        )
+        for position_id, pay_date, amount in dividends
+    ]
 
 
 def get_daily_cash_flow_snapshots(
@@ -129,7 +123,7 @@ def get_daily_cash_flow_snapshots(
     """
     query = db.query(
         Dividend.pay_date,
-        func.sum(Dividend.amount).label('total_amount')
+        cast(func.sum(Dividend.amount), Float).label('total_amount')
     ).filter(
         and_(
             Dividend.user_id == user_id,
@@ -143,21 +137,21 @@ def get_daily_cash_flow_snapshots(
     # Group by date and sum amounts
     daily_aggregates = query.group_by(Dividend.pay_date).order_by(Dividend.pay_date).all()
     
-    snapshots = []
-    for date, total_amount in daily_aggregates:
-        # Convert Date to datetime for consistency
-        if isinstance(date, datetime):
-            timestamp = date
-        else:
-            # Convert date to datetime at midnight
-            timestamp = datetime.combine(date, datetime.min.time())
-        
-        snapshots.append(
-            CashFlowSnapshot(
-                position_id=None,  # Aggregated, no single position
-                timestamp=timestamp,
-                amount=float(total_amount) if total_amount else 0.0
-            )
+    return [
+        CashFlowSnapshot(
+            position_id=None,  # Aggregated, no single position
+            timestamp=_midnight(pay_date),
+            amount=total_amount,
         )
+        for pay_date, total_amount in daily_aggregates
+    ]
+
+
+def _midnight(value: date) -> datetime:
+    """
+    Midnight datetime for a Date column value.
     
-    return snapshots
+    pay_date and ex_date are Date columns, so the driver always returns a
+    date and no per-row isinstance check is needed.
+    """
+    return datetime(value.year, value.month, value.day)
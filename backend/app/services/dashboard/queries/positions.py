@@ -1,16 +1,17 @@
 """
 Position query layer for dashboard
 """
-from typing import List, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from sqlalchemy import Select, and_, desc, false, func, lambda_stmt, or_, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 from app.models.position import Position
 
 
-@dataclass
+@dataclass(slots=True)
 class PositionSnapshot:
     """DTO for raw position data"""
     position_id: int
@@ -21,6 +22,22 @@ class PositionSnapshot:
     timestamp: datetime
 
 
+# Columns read into PositionSnapshot; queries select these instead of whole
+# Position entities to skip ORM hydration and the identity map
+_SNAPSHOT_COLUMNS = (
+    Position.id,
+    Position.account_id,
+    Position.ticker,
+    Position.asset_type,
+    Position.shares,
+    Position.market_value,
+    Position.snapshot_timestamp,
+)
+
+# Rows fetched per round-trip when streaming long histories
+_STREAM_BATCH_SIZE = 1000
+
+
 def get_position_snapshots(
     db: Session,
     user_id: int,
@@ -42,20 +59,23 @@ def get_position_snapshots(
     Returns:
         List of PositionSnapshot objects
     """
-    # Base query for user's positions
-    base_query = db.query(Position).filter(
+    # Range bounds as scalar subqueries so baseline and end rows come back
+    # in one round-trip: the baseline is the earliest snapshot in range, the
+    # end is every row from the most recent day on/before end_date (grouped by
+    # date, not exact timestamp, since holdings may be stamped slightly apart)
+    latest_timestamp = db.query(
+        func.max(Position.snapshot_timestamp)
+    ).filter(
         and_(
             Position.user_id == user_id,
             Position.snapshot_timestamp <= end_date
         )
-    )
-    
-    snapshots = []
+    ).scalar_subquery()
+    on_latest_day = func.date(Position.snapshot_timestamp) == func.date(latest_timestamp)
     
-    # Get baseline snapshot (at or before start_date)
+    # When start_date == end_date, just get the most recent positions
     if start_date and start_date != end_date:
-        # Get the earliest timestamp in range
-        earliest_timestamp_subquery = db.query(
+        earliest_timestamp = db.query(
             func.min(Position.snapshot_timestamp)
         ).filter(
             and_(
@@ -63,34 +83,40 @@ def get_position_snapshots(
                 Position.snapshot_timestamp >= start_date,
                 Position.snapshot_timestamp <= end_date
             )
-        ).scalar()
-        
-        if earliest_timestamp_subquery:
-            baseline_positions = db.query(Position).filter(
-                and_(
-                    Position.user_id == user_id,
-                    Position.snapshot_timestamp == earliest_timestamp_subquery
-                )
-            ).all()
-            
-            for pos in baseline_positions:
-                snapshots.append(_position_to_snapshot(pos))
-    
-    # Get end-of-range snapshot (most recent before end_date)
-    # When start_date == end_date, just get the most recent positions
-    end_positions = base_query.order_by(desc(Position.snapshot_timestamp)).all()
+        ).scalar_subquery()
+        is_baseline = Position.snapshot_timestamp == earliest_timestamp
+        boundary = or_(is_baseline, on_latest_day)
+    else:
+        is_baseline = false()
+        boundary = on_latest_day
+    
+    rows = db.query(
+        *_SNAPSHOT_COLUMNS,
+        is_baseline.label("is_baseline"),
+    ).filter(
+        and_(
+            Position.user_id == user_id,
+            Position.snapshot_timestamp <= end_date,
+            boundary
+        )
+    ).order_by(desc(Position.snapshot_timestamp)).all()
+    
+    snapshots = [_position_to_snapshot(pos) for pos in rows if pos.is_baseline]
     
-    if end_positions:
-        # Group by date (not exact timestamp) to get all positions from the most recent day
-        # This handles cases where positions have slightly different timestamps
-        latest_date = end_positions[0].snapshot_timestamp.date()
-        latest_timestamp = end_positions[0].snapshot_timestamp
+    if rows:
+        latest_date = rows[0].snapshot_timestamp.date()
         
         # Only add if different from baseline (or if no baseline was set)
         if not snapshots or snapshots[0].timestamp.date() != latest_date:
-            for pos in end_positions:
-                # Include all positions from the most recent date
-                if pos.snapshot_timestamp.date() == latest_date:
+            # Newest first; keep the latest snapshot of each holding
+            # (matches get_daily_portfolio_totals)
+            seen_holdings = set()
+            for pos in rows:
+                if pos.snapshot_timestamp.date() != latest_date:
+                    break
+                holding = (pos.account_id, pos.ticker)
+                if holding not in seen_holdings:
+                    seen_holdings.add(holding)
                     snapshots.append(_position_to_snapshot(pos))
     
     return snapshots
@@ -103,9 +129,10 @@ def get_daily_position_snapshots(
     end_date: datetime,
 ) -> List[PositionSnapshot]:
     """
-    Get one snapshot per day for charting.
+    Get one portfolio snapshot per day for charting.
     
-    Returns the most recent snapshot for each day in the range.
+    Returns the most recent snapshot of each holding (account + ticker)
+    for each day in the range, so a day's rows sum to the portfolio value.
     
     Args:
         db: SQLAlchemy session
@@ -114,9 +141,14 @@ def get_daily_position_snapshots(
         end_date: End of time range
     
     Returns:
-        List of PositionSnapshot objects, one per day
+        List of PositionSnapshot objects, one per holding per day
     """
-    query = db.query(Position).filter(
+    # Rank each holding's snapshots within a day, newest first, so the
+    # database returns only the rows kept (same window as _ranked_by_day)
+    query = db.query(
+        *_SNAPSHOT_COLUMNS,
+        _holding_rank(func.date(Position.snapshot_timestamp)).label("rank"),
+    ).filter(
         and_(
             Position.user_id == user_id,
             Position.snapshot_timestamp <= end_date
@@ -126,25 +158,202 @@ def get_daily_position_snapshots(
     if start_date:
         query = query.filter(Position.snapshot_timestamp >= start_date)
     
-    # Get all positions ordered by timestamp
-    all_positions = query.order_by(desc(Position.snapshot_timestamp)).all()
+    ranked = query.subquery()
+    
+    # Chronological order comes from the database; no sort in Python
+    latest_per_day = db.query(
+        *(ranked.c[column.key] for column in _SNAPSHOT_COLUMNS)
+    ).filter(
+        ranked.c.rank == 1
+    ).order_by(ranked.c.snapshot_timestamp, ranked.c.id)
+    
+    # Stream in batches (server-side cursor) rather than .all(): an ALL range
+    # can span years, and DTOs are built while rows are still arriving
+    return [
+        _position_to_snapshot(pos)
+        for pos in latest_per_day.yield_per(_STREAM_BATCH_SIZE)
+    ]
+
+
+def get_daily_portfolio_totals(
+    db: Session,
+    user_id: int,
+    start_date: Optional[datetime],
+    end_date: datetime,
+) -> List[Tuple[datetime, float]]:
+    """
+    Get total position value per day for charting, aggregated in SQL.
+    
+    Same rows as get_daily_position_snapshots (the most recent snapshot of
+    each holding per day), but summed by the database so only one row per
+    day crosses the wire.
+    
+    Args:
+        db: SQLAlchemy session
+        user_id: User identifier
+        start_date: Start of time range (None for ALL)
+        end_date: End of time range
+    
+    Returns:
+        List of (latest snapshot timestamp of the day, total value), chronological
+    """
+    # Rank each holding's snapshots within a day, newest first
+    # (lambda statements: built and compiled once, only parameters change per call)
+    stmt = lambda_stmt(lambda: _ranked_by_day().where(
+        Position.user_id == user_id,
+        Position.snapshot_timestamp <= end_date,
+    ))
+    if start_date:
+        stmt += lambda s: s.where(Position.snapshot_timestamp >= start_date)
+    stmt += lambda s: _sum_latest_per_day(s.subquery())
+    
+    rows = db.execute(stmt).all()
+    
+    return [(timestamp, float(total)) for timestamp, total in rows]
+
+
+def get_position_total(
+    db: Session,
+    user_id: int,
+    end_date: datetime,
+) -> float:
+    """
+    Get total position value for the most recent day on/before end_date, summed in SQL.
+    
+    Counts the same holdings as get_position_snapshots(end_date, end_date)
+    (the latest snapshot of each account + ticker on that day), without
+    loading the rows.
+    
+    Args:
+        db: SQLAlchemy session
+        user_id: User identifier
+        end_date: End of time range
+    
+    Returns:
+        Total market value (0.0 when there are no positions)
+    """
+    stmt = _latest_holdings(user_id, end_date)
+    stmt += lambda s: _sum_holdings(s.subquery())
+    
+    total = db.execute(stmt).scalar()
+    
+    return float(total) if total is not None else 0.0
+
+
+def get_allocation_by_asset_type(
+    db: Session,
+    user_id: int,
+    end_date: datetime,
+) -> List[Dict[str, float]]:
+    """
+    Get asset allocation for the most recent day on/before end_date, computed in SQL.
+    
+    Groups and percentages are produced by the database (GROUP BY plus a
+    window SUM over the groups), so only one row per asset type is returned.
+    Same output shape as AllocationCalculator.calculate.
+    
+    Args:
+        db: SQLAlchemy session
+        user_id: User identifier
+        end_date: End of time range
+    
+    Returns:
+        List of allocation dicts sorted by value descending
+    """
+    stmt = _latest_holdings(user_id, end_date)
+    stmt += lambda s: _group_holdings_by_asset_type(s.subquery())
+    
+    rows = db.execute(stmt).all()
+    
+    return [
+        {
+            "asset_type": row.asset_type,
+            "value": round(float(row.value), 2),
+            "percent": round(float(row.percent or 0.0), 2),
+        }
+        for row in rows
+    ]
+
+
+def _holding_rank(*partition):
+    """
+    row_number() of each holding's (account + ticker) snapshots, newest first.
     
-    # Group by date, keep most recent snapshot per day
-    seen_dates = {}
-    result = []
+    Every "latest snapshot per holding" read keeps rank 1 of this window;
+    partition narrows it further (e.g. by day).
+    """
+    return func.row_number().over(
+        partition_by=(*partition, Position.account_id, Position.ticker),
+        order_by=desc(Position.snapshot_timestamp),
+    )
+
+
+def _ranked_by_day() -> Select:
+    """Positions with each holding's snapshots ranked per day, newest first"""
+    day = func.date(Position.snapshot_timestamp)
+    return select(
+        day.label("day"),
+        Position.snapshot_timestamp.label("snapshot_timestamp"),
+        func.coalesce(Position.market_value, 0).label("value"),
+        _holding_rank(day).label("rank"),
+    )
+
+
+def _sum_latest_per_day(ranked) -> Select:
+    """Sum the rank-1 rows of _ranked_by_day per day, chronologically"""
+    return select(
+        func.max(ranked.c.snapshot_timestamp),
+        func.sum(ranked.c.value),
+    ).where(
+        ranked.c.rank == 1
+    ).group_by(ranked.c.day).order_by(ranked.c.day)
+
+
+def _latest_holdings(user_id: int, end_date: datetime) -> StatementLambdaElement:
+    """
+    Positions on the most recent day on/before end_date.
     
-    for pos in all_positions:
-        date_key = pos.snapshot_timestamp.date()
-        if date_key not in seen_dates:
-            seen_dates[date_key] = True
-            result.append(_position_to_snapshot(pos))
+    Each holding (account + ticker) is ranked newest first; callers keep
+    rank 1 so a holding snapshotted twice that day is counted once.
+    """
+    return lambda_stmt(lambda: select(
+        Position.asset_type.label("asset_type"),
+        func.coalesce(Position.market_value, 0).label("value"),
+        _holding_rank().label("rank"),
+    ).where(
+        Position.user_id == user_id,
+        Position.snapshot_timestamp <= end_date,
+        func.date(Position.snapshot_timestamp) == func.date(
+            select(func.max(Position.snapshot_timestamp)).where(
+                Position.user_id == user_id,
+                Position.snapshot_timestamp <= end_date,
+            ).scalar_subquery()
+        ),
+    ))
+
+
+def _sum_holdings(holdings) -> Select:
+    """Total value of the rank-1 rows of _latest_holdings"""
+    return select(func.sum(holdings.c.value)).where(holdings.c.rank == 1)
+
+
+def _group_holdings_by_asset_type(holdings) -> Select:
+    """Value and percent per asset type of the rank-1 rows of _latest_holdings"""
+    asset_type = func.coalesce(holdings.c.asset_type, "OTHER").label("asset_type")
+    value = func.sum(holdings.c.value)
+    percent = value * 100.0 / func.nullif(func.sum(value).over(), 0)
     
-    # Return in chronological order
-    return sorted(result, key=lambda x: x.timestamp)
+    return select(
+        asset_type,
+        value.label("value"),
+        percent.label("percent"),
+    ).where(
+        holdings.c.rank == 1
+    ).group_by(asset_type).order_by(desc("value"))
 
 
-def _position_to_snapshot(position: Position) -> PositionSnapshot:
-    """Convert Position model to PositionSnapshot DTO"""
+def _position_to_snapshot(position) -> PositionSnapshot:
+    """Convert a Position model or _SNAPSHOT_COLUMNS row to PositionSnapshot DTO"""
     market_value = float(position.market_value) if position.market_value else 0.0
     shares = float(position.shares) if position.shares else 0.0
     
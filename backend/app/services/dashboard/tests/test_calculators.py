@@ -10,6 +10,8 @@ from app.services.dashboard.queries.dividends import CashFlowSnapshot
 from app.services.dashboard.calculators.totals import TotalsCalculator
 from app.services.dashboard.calculators.performance import PerformanceCalculator
 from app.services.dashboard.calculators.allocation import AllocationCalculator
+from app.services.dashboard.calculators.cash import build_cash_prefix
+from app.services.dashboard.models.dashboard_models import TimeSeriesPoint
 
 
 class TestTotalsCalculator:
@@ -123,6 +125,49 @@ class TestTotalsCalculator:
         assert end == 1100.0  # 1000 (positions) + 100 (cash)
         assert abs_delta == 100.0
         assert abs(pct_delta - 10.0) < 0.1
+    
+    def test_calculate_excludes_cash_flows_after_end(self):
+        """Test only cash flows on/before end_timestamp are counted"""
+        snapshots = [
+            PositionSnapshot(1, "STOCK", 10.0, 100.0, 1000.0, datetime(2025, 1, 1)),
+        ]
+        cash_flows = [
+            CashFlowSnapshot(None, datetime(2025, 1, 1), 10.0),
+            CashFlowSnapshot(None, datetime(2025, 1, 5), 20.0),
+            CashFlowSnapshot(None, datetime(2025, 1, 10), 40.0),
+        ]
+        
+        _, end, _, _ = TotalsCalculator.calculate(
+            snapshots, snapshots, cash_flows=cash_flows, end_timestamp=datetime(2025, 1, 5)
+        )
+        
+        assert end == 1030.0
+
+
+class TestCashPrefix:
+    """Test shared cumulative cash prefix"""
+    
+    def test_build_sorts_and_accumulates(self):
+        """Test out-of-order flows are sorted and summed, last total per timestamp wins"""
+        prefix = build_cash_prefix([
+            CashFlowSnapshot(None, datetime(2025, 1, 3), 5.0),
+            CashFlowSnapshot(None, datetime(2025, 1, 1), 10.0),
+            CashFlowSnapshot(None, datetime(2025, 1, 1), 20.0),
+        ])
+        
+        assert prefix.timestamps == [datetime(2025, 1, 1), datetime(2025, 1, 3)]
+        assert prefix.cumulative == [30.0, 35.0]
+    
+    def test_total_through(self):
+        """Test cumulative lookup before, between and after flows"""
+        prefix = build_cash_prefix([
+            CashFlowSnapshot(None, datetime(2025, 1, 2), 10.0),
+            CashFlowSnapshot(None, datetime(2025, 1, 4), 15.0),
+        ])
+        
+        assert prefix.total_through(datetime(2025, 1, 1)) == 0.0
+        assert prefix.total_through(datetime(2025, 1, 3)) == 10.0
+        assert prefix.total_through(datetime(2025, 1, 4)) == 25.0
 
 
 class TestPerformanceCalculator:
@@ -144,15 +189,15 @@ class TestPerformanceCalculator:
         
         position_series = result["position_series"]
         assert len(position_series) == 2
-        assert position_series[0]["value"] == 1250.0  # 1000 + 250
-        assert position_series[1]["value"] == 1100.0
+        assert position_series[0].value == 1250.0  # 1000 + 250
+        assert position_series[1].value == 1100.0
     
     def test_calculate_stats(self):
         """Test performance stats calculation"""
         series = [
-            {"timestamp": datetime(2025, 1, 1), "value": 1000.0},
-            {"timestamp": datetime(2025, 1, 2), "value": 1200.0},
-            {"timestamp": datetime(2025, 1, 3), "value": 800.0},
+            TimeSeriesPoint(timestamp=datetime(2025, 1, 1), value=1000.0),
+            TimeSeriesPoint(timestamp=datetime(2025, 1, 2), value=1200.0),
+            TimeSeriesPoint(timestamp=datetime(2025, 1, 3), value=800.0),
         ]
         
         stats = PerformanceCalculator.calculate_stats(series)
@@ -163,8 +208,8 @@ class TestPerformanceCalculator:
     def test_calculate_delta(self):
         """Test delta calculation from series"""
         series = [
-            {"timestamp": datetime(2025, 1, 1), "value": 1000.0},
-            {"timestamp": datetime(2025, 1, 2), "value": 1200.0},
+            TimeSeriesPoint(timestamp=datetime(2025, 1, 1), value=1000.0),
+            TimeSeriesPoint(timestamp=datetime(2025, 1, 2), value=1200.0),
         ]
         
         abs_delta, pct_delta = PerformanceCalculator.calculate_delta(series)
@@ -191,12 +236,12 @@ class TestPerformanceCalculator:
         
         # Check position series
         assert len(result["position_series"]) == 2
-        assert result["position_series"][0]["value"] == 1000.0
+        assert result["position_series"][0].value == 1000.0
         
         # Check cash series (cumulative)
         assert len(result["cash_series"]) == 2
-        assert result["cash_series"][0]["value"] == 50.0
-        assert result["cash_series"][1]["value"] == 75.0  # 50 + 25
+        assert result["cash_series"][0].value == 50.0
+        assert result["cash_series"][1].value == 75.0  # 50 + 25
         
         # Check total series (merged)
         assert len(result["total_series"]) >= 2
@@ -214,7 +259,7 @@ class TestPerformanceCalculator:
         result = PerformanceCalculator.calculate_series(snapshots, cash_flows=cash_flows)
         
         # Total series should include all timestamps
-        timestamps = [p["timestamp"] for p in result["total_series"]]
+        timestamps = [p.timestamp for p in result["total_series"]]
         assert datetime(2025, 1, 1) in timestamps
         assert datetime(2025, 1, 2) in timestamps
         assert datetime(2025, 1, 3) in timestamps
@@ -233,10 +278,74 @@ class TestPerformanceCalculator:
         
         # On day 2, position value should be forward-filled from day 1
         total_series = result["total_series"]
-        day2_point = next((p for p in total_series if p["timestamp"] == datetime(2025, 1, 2)), None)
+        day2_point = next((p for p in total_series if p.timestamp == datetime(2025, 1, 2)), None)
         assert day2_point is not None
         # Should be 1000 (position from day 1) + 50 (cash on day 2)
-        assert day2_point["value"] == 1050.0
+        assert day2_point.value == 1050.0
+    
+    def test_build_all_matches_separate_passes(self):
+        """Test fused build matches calculate_series + calculate_stats + calculate_delta"""
+        snapshots = [
+            PositionSnapshot(1, "STOCK", 10.0, 100.0, 1000.0, datetime(2025, 1, 1)),
+            PositionSnapshot(1, "STOCK", 10.0, 80.0, 800.0, datetime(2025, 1, 3)),
+            PositionSnapshot(1, "STOCK", 10.0, 120.0, 1200.0, datetime(2025, 1, 4)),
+        ]
+        cash_flows = [
+            CashFlowSnapshot(1, datetime(2025, 1, 2), 50.0),
+        ]
+        
+        total, positions, cash, stats, delta = PerformanceCalculator.build_all(
+            snapshots, cash_flows
+        )
+        series = PerformanceCalculator.calculate_series(snapshots, cash_flows=cash_flows)
+        
+        assert total == series["total_series"]
+        assert positions == series["position_series"]
+        assert cash == series["cash_series"]
+        assert stats == PerformanceCalculator.calculate_stats(total)
+        assert delta == PerformanceCalculator.calculate_delta(total)
+    
+    def test_build_all_positions_only(self):
+        """Test total series equals position series when there are no cash flows"""
+        snapshots = [
+            PositionSnapshot(1, "STOCK", 10.0, 100.0, 1000.0, datetime(2025, 1, 2)),
+            PositionSnapshot(1, "STOCK", 10.0, 90.0, 900.0, datetime(2025, 1, 1)),
+        ]
+        
+        total, positions, cash, stats, _ = PerformanceCalculator.build_all(snapshots)
+        
+        assert total is positions  # built once, shared
+        assert [p.value for p in total] == [900.0, 1000.0]
+        assert cash == []
+        assert stats == {"max": 1000.0, "min": 900.0}
+    
+    def test_build_all_merges_shared_and_interleaved_timestamps(self):
+        """Test two-pointer merge forward-fills both sides and collapses shared timestamps"""
+        snapshots = [
+            PositionSnapshot(1, "STOCK", 10.0, 100.0, 1000.0, datetime(2025, 1, 1)),
+            PositionSnapshot(1, "STOCK", 10.0, 110.0, 1100.0, datetime(2025, 1, 3)),
+            PositionSnapshot(1, "STOCK", 10.0, 120.0, 1200.0, datetime(2025, 1, 5)),
+        ]
+        cash_flows = [
+            CashFlowSnapshot(None, datetime(2025, 1, 2), 10.0),
+            CashFlowSnapshot(None, datetime(2025, 1, 3), 20.0),
+            CashFlowSnapshot(None, datetime(2025, 1, 6), 30.0),
+        ]
+        
+        total, _, _, stats, _ = PerformanceCalculator.build_all(snapshots, cash_flows)
+        
+        assert [(p.timestamp.day, p.value) for p in total] == [
+            (1, 1000.0), (2, 1010.0), (3, 1130.0), (5, 1230.0), (6, 1260.0),
+        ]
+        assert stats == {"max": 1260.0, "min": 1000.0}
+    
+    def test_build_all_empty(self):
+        """Test fused build with no data"""
+        total, positions, cash, stats, delta = PerformanceCalculator.build_all([])
+        
+        assert total == [] and positions == [] and cash == []
+        assert stats == {"max": 0.0, "min": 0.0}
+        assert delta == (0.0, 0.0)
 
 
 class TestAllocationCalculator:
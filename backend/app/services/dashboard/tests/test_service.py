@@ -2,14 +2,17 @@
 Integration tests for DashboardService (mocked queries)
 """
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock, patch
 
+from app.models import User, Dividend, DividendStatus
+from app.services.dashboard import dashboard_service
 from app.services.dashboard.dashboard_service import DashboardService
 from app.services.dashboard.models.time_range import TimeRange, TimeGranularity
 from app.services.dashboard.queries.positions import PositionSnapshot
 from app.services.dashboard.queries.dividends import CashFlowSnapshot
 from app.services.dashboard.queries.activity import ActivityItem, ActivityType
+from app.services.dashboard.calculators.allocation import AllocationCalculator
 
 
 class TestDashboardService:
@@ -33,21 +36,20 @@ class TestDashboardService:
     def test_build_dashboard_basic(self, mock_pos_queries, mock_div_queries, mock_activity_queries, mock_db, time_range):
         """Test basic dashboard building"""
         # Mock query responses
-        start_snapshots = [
-            PositionSnapshot(1, "preferred_stock", 100.0, 100.0, 10000.0, time_range.start_date),
-        ]
         end_snapshots = [
             PositionSnapshot(1, "preferred_stock", 100.0, 110.0, 11000.0, time_range.end_date),
         ]
-        daily_snapshots = [
-            PositionSnapshot(1, "preferred_stock", 100.0, 100.0, 10000.0, time_range.start_date),
-            PositionSnapshot(1, "preferred_stock", 100.0, 110.0, 11000.0, time_range.end_date),
+        daily_totals = [
+            (time_range.start_date, 10000.0),
+            (time_range.end_date, 11000.0),
         ]
         cash_flows = []  # No cash flows for basic test
         
-        mock_pos_queries.get_position_snapshots.side_effect = [start_snapshots, end_snapshots]
-        mock_pos_queries.get_daily_position_snapshots.return_value = daily_snapshots
+        mock_pos_queries.get_position_total.return_value = sum(s.value for s in end_snapshots)
+        mock_pos_queries.get_allocation_by_asset_type.return_value = AllocationCalculator.calculate(end_snapshots)
+        mock_pos_queries.get_daily_portfolio_totals.return_value = daily_totals
         mock_div_queries.get_daily_cash_flow_snapshots.return_value = cash_flows
+        mock_activity_queries.get_dividend_activity.return_value = ([], [])
         
         # Build dashboard
         snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
@@ -67,26 +69,23 @@ class TestDashboardService:
     @patch('app.services.dashboard.dashboard_service.position_queries')
     def test_build_dashboard_with_cash_flows(self, mock_pos_queries, mock_div_queries, mock_activity_queries, mock_db, time_range):
         """Test dashboard building with cash flows"""
-        start_snapshots = [
-            PositionSnapshot(1, "preferred_stock", 100.0, 100.0, 10000.0, time_range.start_date),
-        ]
         end_snapshots = [
             PositionSnapshot(1, "preferred_stock", 100.0, 110.0, 11000.0, time_range.end_date),
         ]
-        daily_snapshots = [
-            PositionSnapshot(1, "preferred_stock", 100.0, 100.0, 10000.0, time_range.start_date),
-            PositionSnapshot(1, "preferred_stock", 100.0, 110.0, 11000.0, time_range.end_date),
+        daily_totals = [
+            (time_range.start_date, 10000.0),
+            (time_range.end_date, 11000.0),
         ]
         cash_flows = [
             CashFlowSnapshot(1, time_range.start_date + timedelta(days=15), 250.0),
         ]
         
-        mock_pos_queries.get_position_snapshots.side_effect = [start_snapshots, end_snapshots]
-        mock_pos_queries.get_daily_position_snapshots.return_value = daily_snapshots
+        mock_pos_queries.get_position_total.return_value = sum(s.value for s in end_snapshots)
+        mock_pos_queries.get_allocation_by_asset_type.return_value = AllocationCalculator.calculate(end_snapshots)
+        mock_pos_queries.get_daily_portfolio_totals.return_value = daily_totals
         mock_div_queries.get_daily_cash_flow_snapshots.return_value = cash_flows
         mock_activity_queries.get_trades.return_value = []
-        mock_activity_queries.get_paid_dividends.return_value = []
-        mock_activity_queries.get_upcoming_dividends.return_value = []
+        mock_activity_queries.get_dividend_activity.return_value = ([], [])
         
         # Build dashboard
         snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
@@ -107,12 +106,12 @@ class TestDashboardService:
     @patch('app.services.dashboard.dashboard_service.position_queries')
     def test_build_dashboard_empty_portfolio(self, mock_pos_queries, mock_div_queries, mock_activity_queries, mock_db, time_range):
         """Test dashboard with empty portfolio"""
-        mock_pos_queries.get_position_snapshots.return_value = []
-        mock_pos_queries.get_daily_position_snapshots.return_value = []
+        mock_pos_queries.get_position_total.return_value = 0.0
+        mock_pos_queries.get_allocation_by_asset_type.return_value = []
+        mock_pos_queries.get_daily_portfolio_totals.return_value = []
         mock_div_queries.get_daily_cash_flow_snapshots.return_value = []
         mock_activity_queries.get_trades.return_value = []
-        mock_activity_queries.get_paid_dividends.return_value = []
-        mock_activity_queries.get_upcoming_dividends.return_value = []
+        mock_activity_queries.get_dividend_activity.return_value = ([], [])
         
         snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
         
@@ -121,6 +120,82 @@ class TestDashboardService:
         assert len(snapshot.allocation) == 0
         assert len(snapshot.performance.series) == 0
     
+    @patch('app.services.dashboard.dashboard_service.activity_queries')
+    @patch('app.services.dashboard.dashboard_service.dividend_queries')
+    @patch('app.services.dashboard.dashboard_service.position_queries')
+    def test_build_dashboard_cash_only(self, mock_pos_queries, mock_div_queries, mock_activity_queries, mock_db, time_range):
+        """Test cash-only portfolio: total series is the cash series, no allocation"""
+        cash_flows = [
+            CashFlowSnapshot(None, time_range.start_date + timedelta(days=5), 100.0),
+            CashFlowSnapshot(None, time_range.start_date + timedelta(days=20), 150.0),
+        ]
+        
+        mock_pos_queries.get_position_total.return_value = 0.0
+        mock_pos_queries.get_allocation_by_asset_type.return_value = []
+        mock_pos_queries.get_daily_portfolio_totals.return_value = []
+        mock_div_queries.get_daily_cash_flow_snapshots.return_value = cash_flows
+        mock_activity_queries.get_dividend_activity.return_value = ([], [])
+        
+        snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
+        
+        assert snapshot.total.current == 250.0
+        assert snapshot.allocation == []
+        assert snapshot.performance.position_series is None
+        assert [p.value for p in snapshot.performance.series] == [100.0, 250.0]
+        assert snapshot.performance.series == snapshot.performance.cash_series
+    
+    @patch('app.services.dashboard.dashboard_service.activity_queries')
+    @patch('app.services.dashboard.dashboard_service.dividend_queries')
+    @patch('app.services.dashboard.dashboard_service.position_queries')
+    def test_build_dashboard_totals_from_daily_totals(self, mock_pos_queries, mock_div_queries, mock_activity_queries, mock_db, time_range):
+        """Test totals and series come from SQL aggregates, not position rows"""
+        end_snapshots = [
+            PositionSnapshot(1, "preferred_stock", 100.0, 110.0, 11000.0, time_range.end_date),
+            PositionSnapshot(2, "common_stock", 10.0, 50.0, 500.0, time_range.end_date),
+        ]
+        
+        mock_pos_queries.get_daily_portfolio_totals.return_value = [
+            (time_range.start_date, 10000.0),
+            (time_range.end_date, 11500.0),
+        ]
+        mock_pos_queries.get_position_total.return_value = sum(s.value for s in end_snapshots)
+        mock_pos_queries.get_allocation_by_asset_type.return_value = AllocationCalculator.calculate(end_snapshots)
+        mock_div_queries.get_daily_cash_flow_snapshots.return_value = []
+        mock_activity_queries.get_trades.return_value = []
+        mock_activity_queries.get_dividend_activity.return_value = ([], [])
+        
+        snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
+        
+        assert snapshot.total.start == 10000.0
+        assert snapshot.total.current == 11500.0
+        assert [p.value for p in snapshot.performance.series] == [10000.0, 11500.0]
+        assert len(snapshot.allocation) == 2
+        mock_pos_queries.get_daily_position_snapshots.assert_not_called()
+        mock_pos_queries.get_position_snapshots.assert_not_called()
+        mock_pos_queries.get_position_total.assert_not_called()
+    
+    @patch('app.services.dashboard.dashboard_service.activity_queries')
+    @patch('app.services.dashboard.dashboard_service.dividend_queries')
+    @patch('app.services.dashboard.dashboard_service.position_queries')
+    def test_build_dashboard_end_total_without_daily_totals(self, mock_pos_queries, mock_div_queries, mock_activity_queries, mock_db, time_range):
+        """Test holdings from before the range stand in for both ends"""
+        end_snapshots = [
+            PositionSnapshot(1, "preferred_stock", 100.0, 90.0, 9000.0, time_range.start_date - timedelta(days=3)),
+        ]
+        
+        mock_pos_queries.get_daily_portfolio_totals.return_value = []
+        mock_pos_queries.get_position_total.return_value = 9000.0
+        mock_pos_queries.get_allocation_by_asset_type.return_value = AllocationCalculator.calculate(end_snapshots)
+        mock_div_queries.get_daily_cash_flow_snapshots.return_value = []
+        mock_activity_queries.get_trades.return_value = []
+        mock_activity_queries.get_dividend_activity.return_value = ([], [])
+        
+        snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
+        
+        assert snapshot.total.start == 9000.0
+        assert snapshot.total.current == 9000.0
+        mock_pos_queries.get_position_total.assert_called_once_with(mock_db, 1, time_range.end_date)
+    
     def test_build_dashboard_invalid_user_id(self, mock_db, time_range):
         """Test dashboard with invalid user_id"""
         with pytest.raises(ValueError, match="user_id required"):
@@ -135,15 +210,15 @@ class TestDashboardService:
             PositionSnapshot(2, "common_stock", 50.0, 50.0, 2500.0, time_range.end_date),
         ]
         
-        mock_pos_queries.get_position_snapshots.side_effect = [[], end_snapshots]
-        mock_pos_queries.get_daily_position_snapshots.return_value = []
+        mock_pos_queries.get_position_total.return_value = sum(s.value for s in end_snapshots)
+        mock_pos_queries.get_allocation_by_asset_type.return_value = AllocationCalculator.calculate(end_snapshots)
+        mock_pos_queries.get_daily_portfolio_totals.return_value = []
         mock_div_queries.get_daily_cash_flow_snapshots.return_value = []
         
         # Mock activity queries
         with patch('app.services.dashboard.dashboard_service.activity_queries') as mock_activity:
             mock_activity.get_trades.return_value = []
-            mock_activity.get_paid_dividends.return_value = []
-            mock_activity.get_upcoming_dividends.return_value = []
+            mock_activity.get_dividend_activity.return_value = ([], [])
             
             snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
         
@@ -160,8 +235,9 @@ class TestDashboardService:
             PositionSnapshot(1, "preferred_stock", 100.0, 100.0, 10000.0, time_range.end_date),
         ]
         
-        mock_pos_queries.get_position_snapshots.side_effect = [[], end_snapshots]
-        mock_pos_queries.get_daily_position_snapshots.return_value = []
+        mock_pos_queries.get_position_total.return_value = sum(s.value for s in end_snapshots)
+        mock_pos_queries.get_allocation_by_asset_type.return_value = AllocationCalculator.calculate(end_snapshots)
+        mock_pos_queries.get_daily_portfolio_totals.return_value = []
         mock_div_queries.get_daily_cash_flow_snapshots.return_value = []
         
         # Mock activity items
@@ -185,8 +261,7 @@ class TestDashboardService:
         ]
         
         mock_activity_queries.get_trades.return_value = []
-        mock_activity_queries.get_paid_dividends.return_value = [activity_items[0]]
-        mock_activity_queries.get_upcoming_dividends.return_value = [activity_items[1]]
+        mock_activity_queries.get_dividend_activity.return_value = ([activity_items[0]], [activity_items[1]])
         
         snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
         
@@ -205,14 +280,125 @@ class TestDashboardService:
             PositionSnapshot(1, "preferred_stock", 100.0, 100.0, 10000.0, time_range.end_date),
         ]
         
-        mock_pos_queries.get_position_snapshots.side_effect = [[], end_snapshots]
-        mock_pos_queries.get_daily_position_snapshots.return_value = []
+        mock_pos_queries.get_position_total.return_value = sum(s.value for s in end_snapshots)
+        mock_pos_queries.get_allocation_by_asset_type.return_value = AllocationCalculator.calculate(end_snapshots)
+        mock_pos_queries.get_daily_portfolio_totals.return_value = []
         mock_div_queries.get_daily_cash_flow_snapshots.return_value = []
         mock_activity_queries.get_trades.return_value = []
-        mock_activity_queries.get_paid_dividends.return_value = []
-        mock_activity_queries.get_upcoming_dividends.return_value = []
+        mock_activity_queries.get_dividend_activity.return_value = ([], [])
         
         snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
         
         assert len(snapshot.activity) == 0
+    
+    @patch('app.services.dashboard.dashboard_service.activity_queries')
+    @patch('app.services.dashboard.dashboard_service.dividend_queries')
+    @patch('app.services.dashboard.dashboard_service.position_queries')
+    def test_build_dashboard_trades_flag(self, mock_pos_queries, mock_div_queries, mock_activity_queries, mock_db, time_range):
+        """Test get_trades is only called when TRADES_ENABLED is set"""
+        trade = ActivityItem(
+            timestamp=time_range.start_date + timedelta(days=1),
+            activity_type=ActivityType.BUY,
+            position_id=1,
+            asset_type="preferred_stock",
+            quantity=10.0,
+            value=1000.0,
+            ticker="STRC"
+        )
+        
+        mock_pos_queries.get_allocation_by_asset_type.return_value = []
+        mock_pos_queries.get_daily_portfolio_totals.return_value = []
+        mock_div_queries.get_daily_cash_flow_snapshots.return_value = [
+            CashFlowSnapshot(None, time_range.start_date + timedelta(days=5), 100.0),
+        ]
+        mock_activity_queries.get_trades.return_value = [trade]
+        mock_activity_queries.get_dividend_activity.return_value = ([], [])
+        
+        mock_activity_queries.TRADES_ENABLED = False
+        snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
+        
+        assert snapshot.activity == []
+        mock_activity_queries.get_trades.assert_not_called()
+        
+        mock_activity_queries.TRADES_ENABLED = True
+        snapshot = DashboardService.build_dashboard(mock_db, 1, time_range)
+        
+        assert [item.activity_type for item in snapshot.activity] == ["BUY"]
+
 
+class TestDashboardCache:
+    """Test cached dashboard lookups"""
+    
+    @patch.object(DashboardService, 'build_dashboard')
+    def test_get_dashboard_reuses_cached_snapshot(self, mock_build):
+        """Test repeated requests within the same minute share one build"""
+        mock_build.return_value = DashboardService._empty_dashboard()
+        end_date = datetime(2025, 1, 15, 12, 0, 5)
+        first = TimeRange(end_date - timedelta(days=30), end_date, TimeGranularity.DAILY)
+        later = TimeRange(
+            first.start_date + timedelta(seconds=20), end_date + timedelta(seconds=20), TimeGranularity.DAILY
+        )
+        
+        DashboardService.get_dashboard(Mock(), 101, first)
+        DashboardService.get_dashboard(Mock(), 101, later)
+        
+        assert mock_build.call_count == 1
+    
+    @patch.object(DashboardService, 'build_dashboard')
+    def test_invalidate_forces_rebuild(self, mock_build):
+        """Test invalidating a user drops their cached dashboards"""
+        mock_build.return_value = DashboardService._empty_dashboard()
+        end_date = datetime(2025, 1, 15, 12, 0)
+        time_range = TimeRange(end_date - timedelta(days=30), end_date, TimeGranularity.DAILY)
+        
+        DashboardService.get_dashboard(Mock(), 102, time_range)
+        DashboardService.invalidate(102)
+        DashboardService.get_dashboard(Mock(), 102, time_range)
+        
+        assert mock_build.call_count == 2
+    
+    def _add_dividend(self, db_session):
+        """Flush a paid dividend for a new user and return the user id"""
+        user = User(email="cache@example.com", hashed_password="x", is_active=True)
+        db_session.add(user)
+        db_session.flush()
+        db_session.add(Dividend(
+            user_id=user.id, ticker="STRC", amount=250, pay_date=datetime(2025, 1, 15).date(),
+            status=DividendStatus.PAID,
+        ))
+        db_session.flush()
+        return user.id
+    
+    def test_orm_write_invalidates_on_commit(self, db_session):
+        """Test dividend/position writes invalidate the user's dashboards at commit"""
+        user_id = self._add_dividend(db_session)
+        version = dashboard_service._data_versions.get(user_id)
+        
+        db_session.commit()
+        
+        assert dashboard_service._data_versions.get(user_id) != version
+    
+    def test_rolled_back_write_keeps_cache(self, db_session):
+        """Test rolled-back writes do not invalidate"""
+        user_id = self._add_dividend(db_session)
+        version = dashboard_service._data_versions.get(user_id)
+        
+        db_session.rollback()
+        db_session.commit()
+        
+        assert dashboard_service._data_versions.get(user_id) == version
+
+
+class TestTimeRange:
+    """Test TimeRange input normalization"""
+    
+    def test_aware_dates_normalized_to_naive_utc(self):
+        """Test tz-aware bounds are converted to naive UTC like database timestamps"""
+        eastern = timezone(timedelta(hours=-5))
+        end_date = datetime(2025, 1, 15, 7, 0, tzinfo=eastern)
+        
+        time_range = TimeRange(end_date - timedelta(days=30), end_date, TimeGranularity.DAILY)
+        
+        assert time_range.end_date == datetime(2025, 1, 15, 12, 0)
+        assert time_range.start_date == datetime(2024, 12, 16, 12, 0)
+        assert time_range.end_date.tzinfo is None
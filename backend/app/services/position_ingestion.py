@@ -0,0 +1,71 @@
+"""
+Position snapshot ingestion
+"""
+from datetime import datetime
+from typing import List, Dict, Optional
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.position import Position
+from app.services.dashboard.dashboard_service import DashboardService
+
+# Expressions forming uq_positions_snapshot (must match the index exactly to be
+# used as the conflict target); re-ingesting the same snapshot updates in place
+_SNAPSHOT_KEY = [
+    Position.user_id,
+    func.coalesce(Position.account_id, literal_column("0")),
+    Position.ticker,
+    Position.snapshot_timestamp,
+]
+_UPDATABLE_COLUMNS = ["name", "shares", "cost_basis", "market_value", "asset_type"]
+
+
+def upsert_position_snapshots(
+    db: Session,
+    user_id: int,
+    rows: List[Dict],
+    snapshot_timestamp: Optional[datetime] = None
+) -> datetime:
+    """
+    Write one snapshot of positions with a single INSERT ... ON CONFLICT DO UPDATE.
+
+    Args:
+        db: Database session
+        user_id: User ID
+        rows: Position dicts (account_id, ticker, shares, cost_basis, ...)
+        snapshot_timestamp: Snapshot time shared by all rows (defaults to now)
+
+    Returns:
+        The snapshot timestamp the rows were written under
+    """
+    snapshot_timestamp = snapshot_timestamp or datetime.utcnow()
+    if not rows:
+        return snapshot_timestamp
+
+    now = datetime.utcnow()
+    values = [
+        {
+            **row,
+            "user_id": user_id,
+            "snapshot_timestamp": snapshot_timestamp,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for row in rows
+    ]
+
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(Position).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_SNAPSHOT_KEY,
+        set_={
+            **{column: stmt.excluded[column] for column in _UPDATABLE_COLUMNS},
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+    # Core upsert bypasses the ORM flush events; invalidate explicitly on commit
+    DashboardService.invalidate_on_commit(db, user_id)
+    return snapshot_timestamp
@@ -4,14 +4,17 @@ Standardized mock data factory for development and testing.
 This module provides a reusable way to generate mock data for the application.
 It can be used by seed scripts, tests, and development tools.
 """
-from datetime import datetime, date, timedelta
+from collections import defaultdict
+from datetime import date, timedelta
 from decimal import Decimal
 from typing import List, Dict, Optional
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.models import User, Brokerage, Account, Position, Dividend, ExDate
 from app.models.dividend import DividendStatus
 from app.core.security import get_password_hash
+from app.services.position_ingestion import upsert_position_snapshots
 
 
 class MockDataFactory:
@@ -236,37 +239,36 @@ class MockDataFactory:
                 },
             ]
         
-        positions = []
-        for pos_data in positions_config:
-            # Check if position already exists (by ticker and account)
-            existing = db.query(Position).filter(
+        # Re-seeding updates each holding's latest snapshot in place (keeping
+        # history and the dividends that reference it); new holdings get a
+        # fresh snapshot
+        seeded = {(pos_data["account_id"], pos_data["ticker"]) for pos_data in positions_config}
+        latest = {
+            (account_id, ticker): snapshot_timestamp
+            for account_id, ticker, snapshot_timestamp in db.query(
+                Position.account_id, Position.ticker, func.max(Position.snapshot_timestamp)
+            ).filter(
                 Position.user_id == user_id,
-                Position.account_id == pos_data["account_id"],
-                Position.ticker == pos_data["ticker"]
-            ).first()
-            
-            if existing:
-                # Update existing position
-                for key, value in pos_data.items():
-                    if key != "account_id":  # Don't update account_id
-                        setattr(existing, key, value)
-                existing.snapshot_timestamp = datetime.utcnow()
-                positions.append(existing)
-                continue
-            
-            position = Position(
-                user_id=user_id,
-                snapshot_timestamp=datetime.utcnow(),
-                **pos_data
-            )
-            db.add(position)
-            positions.append(position)
+                Position.ticker.in_({ticker for _, ticker in seeded})
+            ).group_by(Position.account_id, Position.ticker)
+            if (account_id, ticker) in seeded
+        }
+        by_snapshot = defaultdict(list)
+        for pos_data in positions_config:
+            by_snapshot[latest.get((pos_data["account_id"], pos_data["ticker"]))].append(pos_data)
         
+        # Single upsert per snapshot instead of select-then-update per ticker
+        snapshot_timestamps = [
+            upsert_position_snapshots(db, user_id, rows, snapshot_timestamp)
+            for snapshot_timestamp, rows in by_snapshot.items()
+        ]
         db.commit()
-        for position in positions:
-            db.refresh(position)
         
-        return positions
+        positions = db.query(Position).filter(
+            Position.user_id == user_id,
+            Position.snapshot_timestamp.in_(snapshot_timestamps)
+        ).order_by(Position.id).all()
+        return [position for position in positions if (position.account_id, position.ticker) in seeded]
     
     @staticmethod
     def create_dividends(
@@ -0,0 +1,91 @@
+"""
+Tests for the in-process TTL cache
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+import pytest
+
+# Add parent directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.cache import TTLCache
+
+
+class TestTTLCache:
+    """Test cases for TTLCache"""
+    
+    def test_hit_within_ttl(self):
+        """Test loader runs once while the entry is fresh"""
+        cache = TTLCache(ttl=60)
+        calls = []
+        
+        def loader():
+            calls.append(1)
+            return "value"
+        
+        assert cache.get_or_load("k", loader) == "value"
+        assert cache.get_or_load("k", loader) == "value"
+        assert len(calls) == 1
+    
+    def test_expired_entry_reloads(self):
+        """Test loader runs again after the TTL elapses"""
+        cache = TTLCache(ttl=0.01)
+        calls = []
+        
+        def loader():
+            calls.append(1)
+            return len(calls)
+        
+        assert cache.get_or_load("k", loader) == 1
+        time.sleep(0.02)
+        assert cache.get_or_load("k", loader) == 2
+    
+    def test_concurrent_misses_share_one_load(self):
+        """Test single-flight: simultaneous misses call the loader once"""
+        cache = TTLCache(ttl=60)
+        calls = []
+        release = threading.Event()
+        
+        def loader():
+            calls.append(1)
+            release.wait(timeout=1)
+            return "value"
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+        
+        assert results == ["value"] * 5
+        assert len(calls) == 1
+    
+    def test_errors_are_not_cached(self):
+        """Test a failing load propagates and the next call retries"""
+        cache = TTLCache(ttl=60)
+        
+        def failing():
+            raise RuntimeError("upstream down")
+        
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("k", failing)
+        assert cache.get_or_load("k", lambda: "ok") == "ok"
+    
+    def test_maxsize_evicts_oldest(self):
+        """Test the oldest entry is evicted when the cache is full"""
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.get_or_load("a", lambda: 1)
+        cache.get_or_load("b", lambda: 2)
+        cache.get_or_load("c", lambda: 3)
+        
+        assert cache.get_or_load("a", lambda: "reloaded") == "reloaded"
+        assert cache.get_or_load("c", lambda: "reloaded") == 3
@@ -0,0 +1,49 @@
+"""
+Tests for model registration
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from decimal import Decimal
+
+from app.db.base import Base
+from app.models import User, Position
+
+
+class TestModelRegistry:
+    """Guard against duplicate model definitions sharing a table"""
+    
+    def test_single_mapper_per_table(self):
+        """Test each table is mapped by exactly one class"""
+        tables = [mapper.local_table.name for mapper in Base.registry.mappers]
+        
+        assert len(tables) == len(set(tables))
+    
+    def test_users_table_columns(self):
+        """Test the canonical User model owns the users table and its auth columns"""
+        columns = Base.metadata.tables["users"].columns
+        
+        assert User.__table__ is Base.metadata.tables["users"]
+        assert {"email", "hashed_password", "plaid_access_token"} <= set(columns.keys())
+
+
+class TestPositionGainLoss:
+    """Test cases for Position unrealized gain/loss properties"""
+    
+    def test_gain_loss_with_market_value(self):
+        """Test gain/loss is market value minus cost basis"""
+        position = Position(cost_basis=Decimal("1000"), market_value=Decimal("1100"))
+        
+        assert position.unrealized_gain_loss == Decimal("100")
+        assert position.unrealized_gain_loss_percent == Decimal("10")
+    
+    def test_zero_market_value_is_unpriced(self):
+        """Test a zero market value is treated as missing, not as a -100% loss"""
+        position = Position(cost_basis=Decimal("1000"), market_value=Decimal("0"))
+        
+        assert position.unrealized_gain_loss is None
+        assert position.unrealized_gain_loss_percent is None
@@ -0,0 +1,46 @@
+"""
+Tests for token encryption helpers
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import pytest
+
+from app.core.config import settings
+from app.core.security import encrypt_token, decrypt_token, _token_cipher
+
+
+@pytest.fixture(autouse=True)
+def token_encryption_key(monkeypatch):
+    """Configure a test encryption key and reset the cached cipher around each test"""
+    monkeypatch.setattr(settings, "TOKEN_ENCRYPTION_KEY", "test-token-encryption-key")
+    _token_cipher.cache_clear()
+    yield
+    _token_cipher.cache_clear()
+
+
+class TestTokenEncryption:
+    """Test cases for encrypt_token / decrypt_token"""
+    
+    def test_round_trip(self):
+        """Test encrypted token decrypts to the original value"""
+        blob = encrypt_token("access-sandbox-1234")
+        
+        assert isinstance(blob, bytes)
+        assert b"access-sandbox-1234" not in blob
+        assert decrypt_token(blob) == "access-sandbox-1234"
+    
+    def test_nonce_is_random(self):
+        """Test encrypting the same token twice yields different ciphertexts"""
+        assert encrypt_token("token") != encrypt_token("token")
+    
+    def test_missing_key_raises(self, monkeypatch):
+        """Test encryption refuses to fall back to another secret when the key is unset"""
+        monkeypatch.setattr(settings, "TOKEN_ENCRYPTION_KEY", "")
+        
+        with pytest.raises(RuntimeError, match="TOKEN_ENCRYPTION_KEY"):
+            encrypt_token("token")